@@ -0,0 +1,37 @@
+"""Add allocation ledger
+
+Revision ID: 4f2a9c7d1e03
+Revises: 8d513bbeebf7
+Create Date: 2026-10-18 11:02:17.540311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f2a9c7d1e03'
+down_revision = '8d513bbeebf7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('allocation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('donation_id', sa.Integer(), nullable=False),
+    sa.Column('charity_project_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('create_date', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['charity_project_id'], ['charityproject.id'], name='fk_allocation_charity_project_id_charityproject'),
+    sa.ForeignKeyConstraint(['donation_id'], ['donation.id'], name='fk_allocation_donation_id_donation'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_allocation_charity_project_id_id', 'allocation', ['charity_project_id', 'id'], unique=False)
+    op.create_index('ix_allocation_donation_id_id', 'allocation', ['donation_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_allocation_donation_id_id', table_name='allocation')
+    op.drop_index('ix_allocation_charity_project_id_id', table_name='allocation')
+    op.drop_table('allocation')
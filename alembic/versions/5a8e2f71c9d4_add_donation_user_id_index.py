@@ -0,0 +1,25 @@
+"""Add donation user_id index
+
+Revision ID: 5a8e2f71c9d4
+Revises: e7b04d2c6a18
+Create Date: 2026-10-18 18:32:10.418265
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5a8e2f71c9d4'
+down_revision = 'e7b04d2c6a18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_donation_user_id_id', 'donation', ['user_id', 'id']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_donation_user_id_id', table_name='donation')
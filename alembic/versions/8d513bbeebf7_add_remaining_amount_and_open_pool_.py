@@ -0,0 +1,74 @@
+"""Add remaining_amount and open pool indexes
+
+Revision ID: 8d513bbeebf7
+Revises: 93e82fca4d69
+Create Date: 2026-10-18 10:12:41.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d513bbeebf7'
+down_revision = '93e82fca4d69'
+branch_labels = None
+depends_on = None
+
+TABLES = ('charityproject', 'donation')
+BACKFILL_BATCH_SIZE = 10000
+
+
+def backfill_remaining_amount(table_name):
+    table = sa.table(
+        table_name,
+        sa.column('id', sa.Integer),
+        sa.column('full_amount', sa.Integer),
+        sa.column('invested_amount', sa.Integer),
+        sa.column('remaining_amount', sa.Integer),
+    )
+    connection = op.get_bind()
+    max_id = connection.execute(
+        sa.select(sa.func.max(table.c.id))
+    ).scalar() or 0
+    for start in range(0, max_id, BACKFILL_BATCH_SIZE):
+        connection.execute(
+            table.update()
+            .where(
+                table.c.id > start,
+                table.c.id <= start + BACKFILL_BATCH_SIZE,
+            )
+            .values(
+                remaining_amount=table.c.full_amount - table.c.invested_amount
+            )
+        )
+
+
+def upgrade():
+    for table_name in TABLES:
+        op.add_column(
+            table_name,
+            sa.Column('remaining_amount', sa.Integer(), nullable=True)
+        )
+        backfill_remaining_amount(table_name)
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column(
+                'remaining_amount',
+                existing_type=sa.Integer(),
+                nullable=False,
+            )
+        is_open = sa.column('fully_invested', sa.Boolean) == sa.false()
+        op.create_index(
+            f'ix_{table_name}_open_pool',
+            table_name,
+            ['id', 'remaining_amount'],
+            sqlite_where=is_open,
+            postgresql_where=is_open,
+        )
+
+
+def downgrade():
+    for table_name in TABLES:
+        op.drop_index(f'ix_{table_name}_open_pool', table_name=table_name)
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column('remaining_amount')
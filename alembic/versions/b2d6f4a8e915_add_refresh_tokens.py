@@ -0,0 +1,36 @@
+"""Add refresh tokens
+
+Revision ID: b2d6f4a8e915
+Revises: 5a8e2f71c9d4
+Create Date: 2026-10-18 20:05:41.732018
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d6f4a8e915'
+down_revision = '5a8e2f71c9d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('refreshtoken',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('jti', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=True),
+    sa.Column('create_date', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_refreshtoken_user_id_user'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('jti')
+    )
+    op.create_index('ix_refreshtoken_user_id', 'refreshtoken', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_refreshtoken_user_id', table_name='refreshtoken')
+    op.drop_table('refreshtoken')
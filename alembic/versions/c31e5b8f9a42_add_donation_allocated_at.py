@@ -0,0 +1,44 @@
+"""Add donation allocated_at
+
+Revision ID: c31e5b8f9a42
+Revises: 4f2a9c7d1e03
+Create Date: 2026-10-18 12:20:05.874112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c31e5b8f9a42'
+down_revision = '4f2a9c7d1e03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'donation', sa.Column('allocated_at', sa.DateTime(), nullable=True)
+    )
+    donation = sa.table(
+        'donation',
+        sa.column('create_date', sa.DateTime),
+        sa.column('allocated_at', sa.DateTime),
+    )
+    op.execute(
+        donation.update().values(allocated_at=donation.c.create_date)
+    )
+    is_pending = sa.column('allocated_at', sa.DateTime).is_(None)
+    op.create_index(
+        'ix_donation_unallocated',
+        'donation',
+        ['id'],
+        sqlite_where=is_pending,
+        postgresql_where=is_pending,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_donation_unallocated', table_name='donation')
+    with op.batch_alter_table('donation') as batch_op:
+        batch_op.drop_column('allocated_at')
@@ -0,0 +1,37 @@
+"""Add open pool remaining indexes
+
+Revision ID: d4c1a7e95b20
+Revises: b2d6f4a8e915
+Create Date: 2026-10-18 19:05:27.614093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4c1a7e95b20'
+down_revision = 'b2d6f4a8e915'
+branch_labels = None
+depends_on = None
+
+TABLES = ('charityproject', 'donation')
+
+
+def upgrade():
+    is_open = sa.column('fully_invested', sa.Boolean) == sa.false()
+    for table_name in TABLES:
+        op.create_index(
+            f'ix_{table_name}_open_pool_remaining',
+            table_name,
+            ['remaining_amount', 'id'],
+            sqlite_where=is_open,
+            postgresql_where=is_open,
+        )
+
+
+def downgrade():
+    for table_name in TABLES:
+        op.drop_index(
+            f'ix_{table_name}_open_pool_remaining', table_name=table_name
+        )
@@ -0,0 +1,34 @@
+"""Add table version
+
+Revision ID: e7b04d2c6a18
+Revises: c31e5b8f9a42
+Create Date: 2026-10-18 13:41:52.107364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b04d2c6a18'
+down_revision = 'c31e5b8f9a42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    table_version = op.create_table('tableversion',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.bulk_insert(table_version, [
+        dict(name='charityproject', version=0),
+        dict(name='donation', version=0),
+    ])
+
+
+def downgrade():
+    op.drop_table('tableversion')
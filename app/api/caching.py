@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from fastapi import Request, Response
+
+from app.api.etag import NotModified, etag_matches
+from app.services.response_cache import (
+    CacheKey, CachedResponse, response_cache,
+)
+
+CACHE_HEADER = 'X-Cache'
+
+
+class CacheHit(Exception):
+    """Ответ найден в кэше."""
+
+    def __init__(self, response: Response) -> None:
+        self.response = response
+
+
+async def cache_hit_handler(request: Request, exc: CacheHit) -> Response:
+    return exc.response
+
+
+@dataclass
+class CacheSlot:
+    """Место в кэше для ответа, собранного при промахе."""
+    key: CacheKey
+    generation: int
+
+    def store(self, response: Response) -> Response:
+        response_cache.set(
+            self.key,
+            CachedResponse(response.body, dict(response.headers)),
+            self.generation,
+        )
+        response.headers[CACHE_HEADER] = 'MISS'
+        return response
+
+
+def cached(
+    table: str,
+    id_param: Optional[str] = None,
+) -> Callable[..., Optional[CacheSlot]]:
+    """Зависимость кэша ответов: должна стоять первой в эндпоинте.
+    При попадании отвечает из кэша без обращения к БД, при промахе
+    возвращает `CacheSlot` для сохранения ответа. Потоковые ответы
+    не кэшируются. При выключенном кэше возвращает None.
+    """
+    def lookup(request: Request) -> Optional[CacheSlot]:
+        if not response_cache.enabled or 'stream' in request.query_params:
+            return None
+        obj_id = request.path_params.get(id_param) if id_param else None
+        if obj_id is not None and not obj_id.isdigit():
+            return None
+        key = (
+            table,
+            None if obj_id is None else int(obj_id),
+            f'{request.url.path}?{sorted(request.query_params.multi_items())}',
+        )
+        entry = response_cache.get(key)
+        if entry is None:
+            return CacheSlot(key, response_cache.generation(table))
+        etag = entry.headers.get('etag')
+        if etag and etag_matches(etag, request.headers.get('If-None-Match')):
+            raise NotModified(etag)
+        raise CacheHit(Response(
+            entry.body, headers={**entry.headers, CACHE_HEADER: 'HIT'}
+        ))
+
+    return lookup
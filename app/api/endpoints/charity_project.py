@@ -1,22 +1,40 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Response
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.caching import CacheSlot, cached
+from app.api.etag import ETagHeaders, conditional_get
+from app.api.fieldsets import (
+    Fields, fieldset, sparse_object_response, sparse_response,
+)
+from app.api.pagination import PageParams, set_next_cursor
+from app.api.streaming import StreamFormat, get_stream_format, stream_response
 from app.api.validators import (
     check_charity_project_before_edit,
     check_charity_project_exists,
+    check_charity_project_import_size,
     check_charity_project_is_not_invested,
     check_charity_project_name_uniqueness,
+    check_charity_project_names_uniqueness,
+    check_charity_project_row_exists,
 )
+from app.core.config import settings
 from app.core.db import get_async_session
 from app.core.user import current_superuser
-from app.crud import charity_project_crud, donation_crud
+from app.crud import allocation_crud, charity_project_crud, donation_crud
+from app.models import CharityProject
 from app.schemas import (
+    AllocationDB,
     CharityProjectCreate,
     CharityProjectDB,
     CharityProjectUpdate,
+    ResponseCacheStats,
 )
-from app.services.invest import invest
+from app.services.invest import run_investment
+from app.services.project_import import import_charity_projects
+from app.services.response_cache import response_cache
 
 router = APIRouter()
 
@@ -27,10 +45,43 @@ router = APIRouter()
     response_model_exclude_none=True,
 )
 async def get_all_charity_projects(
+    response: Response,
+    cache: Optional[CacheSlot] = Depends(
+        cached(CharityProject.__tablename__)
+    ),
+    page: PageParams = Depends(),
+    stream: Optional[StreamFormat] = Depends(get_stream_format),
+    fields: Fields = Depends(fieldset(CharityProjectDB)),
+    etag: ETagHeaders = Depends(conditional_get(CharityProject.__tablename__)),
     session: AsyncSession = Depends(get_async_session),
 ):
     """Получение списка благотворительных проектов."""
-    return await charity_project_crud.get_multi(session=session)
+    if stream is not None:
+        return stream_response(
+            charity_project_crud.iter_rows(
+                session, fields or CharityProjectDB.__fields__,
+                settings.stream_chunk_size, page.after,
+            ),
+            CharityProjectDB,
+            stream,
+            fields,
+            etag,
+        )
+    if cache is not None:
+        fields = fields or tuple(CharityProjectDB.__fields__)
+    if fields is not None:
+        rows, next_cursor = await charity_project_crud.get_rows_page(
+            session, fields, page.limit, page.after
+        )
+        response = sparse_response(
+            rows, CharityProjectDB, fields, next_cursor, etag
+        )
+        return response if cache is None else cache.store(response)
+    projects, next_cursor = await charity_project_crud.get_page(
+        session, page.limit, page.after
+    )
+    set_next_cursor(response, next_cursor)
+    return projects
 
 
 @router.post(
@@ -46,12 +97,71 @@ async def create_new_charity_project(
     """Создание благотворительного проекта. Только для суперюзеров."""
     await check_charity_project_name_uniqueness(project.name, session)
     new_charity_project = await charity_project_crud.create(data=project,
-                                                            session=session)
-    session.add_all(invest(new_charity_project,
-                           await donation_crud.get_active_objs(session)))
+                                                            session=session,
+                                                            commit=False)
+    await run_investment(new_charity_project, donation_crud, session)
+    response = CharityProjectDB.from_orm(new_charity_project)
     await session.commit()
-    await session.refresh(new_charity_project)
-    return new_charity_project
+    return response
+
+
+@router.post(
+    "/bulk",
+    response_model=list[CharityProjectDB],
+    response_model_exclude_none=True,
+    dependencies=[Depends(current_superuser)],
+)
+async def import_charity_projects_bulk(
+    projects: list[CharityProjectCreate],
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Создание пакета благотворительных проектов.
+    Свободные пожертвования распределяются по новым проектам
+    в порядке пакета. Только для суперюзеров.
+    """
+    check_charity_project_import_size(len(projects))
+    await check_charity_project_names_uniqueness(
+        [project.name for project in projects], session
+    )
+    return await import_charity_projects(projects, session)
+
+
+@router.get(
+    "/cache/stats",
+    response_model=ResponseCacheStats,
+    dependencies=[Depends(current_superuser)],
+)
+async def get_response_cache_stats():
+    """Счетчики кэша ответов. Только для суперюзеров."""
+    return response_cache.stats()
+
+
+@router.get(
+    "/{project_id}",
+    response_model=CharityProjectDB,
+    response_model_exclude_none=True,
+)
+async def get_charity_project(
+    project_id: int,
+    cache: Optional[CacheSlot] = Depends(
+        cached(CharityProject.__tablename__, 'project_id')
+    ),
+    fields: Fields = Depends(fieldset(CharityProjectDB)),
+    etag: ETagHeaders = Depends(conditional_get(CharityProject.__tablename__)),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Получение благотворительного проекта."""
+    if cache is not None:
+        fields = fields or tuple(CharityProjectDB.__fields__)
+    if fields is None:
+        return await check_charity_project_exists(project_id, session)
+    response = sparse_object_response(
+        await check_charity_project_row_exists(project_id, fields, session),
+        CharityProjectDB,
+        fields,
+        etag,
+    )
+    return response if cache is None else cache.store(response)
 
 
 @router.patch(
@@ -65,7 +175,9 @@ async def partially_update_charity_project(
     session: AsyncSession = Depends(get_async_session),
 ):
     """Изменение благотворительного проекта. Только для суперюзеров."""
-    charity_project = await check_charity_project_exists(project_id, session)
+    charity_project = await check_charity_project_exists(
+        project_id, session, for_update=True
+    )
     check_charity_project_before_edit(charity_project, update_data)
     if update_data.name is not None:
         await check_charity_project_name_uniqueness(update_data.name, session)
@@ -84,6 +196,30 @@ async def delete_charity_project(
     session: AsyncSession = Depends(get_async_session),
 ):
     """Удаление благотворительного проекта. Только для суперюзеров."""
-    charity_project = await check_charity_project_exists(project_id, session)
+    charity_project = await check_charity_project_exists(
+        project_id, session, for_update=True
+    )
     check_charity_project_is_not_invested(charity_project)
     return await charity_project_crud.delete(charity_project, session)
+
+
+@router.get(
+    "/{project_id}/allocations",
+    response_model=list[AllocationDB],
+    dependencies=[Depends(current_superuser)],
+)
+async def get_charity_project_allocations(
+    project_id: int,
+    response: Response,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Получение журнала поступлений в проект. Только для суперюзеров."""
+    await check_charity_project_exists(project_id, session)
+    allocations, next_cursor = (
+        await allocation_crud.get_project_allocations(
+            project_id, session, page.limit, page.after
+        )
+    )
+    set_next_cursor(response, next_cursor)
+    return allocations
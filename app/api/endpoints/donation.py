@@ -1,13 +1,36 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.etag import ETagHeaders, conditional_get
+from app.api.fieldsets import Fields, fieldset, sparse_response
+from app.api.pagination import (
+    TOTAL_AMOUNT_HEADER, PageParams, set_next_cursor,
+)
+from app.api.streaming import StreamFormat, get_stream_format, stream_response
+from app.api.validators import (
+    check_donation_available,
+    check_donation_import_size,
+)
+from app.core.config import settings
 from app.core.db import get_async_session
 from app.core.user import current_superuser, current_user
-from app.crud import charity_project_crud, donation_crud
-from app.schemas import DonationCreate, DonationFullDB, DonationShortDB
-from app.services.invest import invest
-from app.models import User
+from app.crud import allocation_crud, charity_project_crud, donation_crud
+from app.schemas import (
+    AllocationDB,
+    DonationCreate,
+    DonationFullDB,
+    DonationImportResult,
+    DonationShortDB,
+    DonationStatusDB,
+)
+from app.services.donation_batcher import donation_batcher
+from app.services.donation_import import import_donations, parse_ndjson
+from app.services.invest import run_investment
+from app.services.invest_worker import INVEST_MODE_DEFERRED, investment_worker
+from app.models import Donation, User
 
 router = APIRouter()
 
@@ -19,10 +42,37 @@ router = APIRouter()
     dependencies=[Depends(current_superuser)],
 )
 async def get_all_donations(
+    response: Response,
+    page: PageParams = Depends(),
+    stream: Optional[StreamFormat] = Depends(get_stream_format),
+    fields: Fields = Depends(fieldset(DonationFullDB)),
+    etag: ETagHeaders = Depends(conditional_get(Donation.__tablename__)),
     session: AsyncSession = Depends(get_async_session),
 ):
     """Получение списка всех пожертвований. Только для суперюзеров."""
-    return await donation_crud.get_multi(session=session)
+    if stream is not None:
+        return stream_response(
+            donation_crud.iter_rows(
+                session, fields or DonationFullDB.__fields__,
+                settings.stream_chunk_size, page.after,
+            ),
+            DonationFullDB,
+            stream,
+            fields,
+            etag,
+        )
+    if fields is not None:
+        rows, next_cursor = await donation_crud.get_rows_page(
+            session, fields, page.limit, page.after
+        )
+        return sparse_response(
+            rows, DonationFullDB, fields, next_cursor, etag
+        )
+    donations, next_cursor = await donation_crud.get_page(
+        session, page.limit, page.after
+    )
+    set_next_cursor(response, next_cursor)
+    return donations
 
 
 @router.post(
@@ -36,14 +86,63 @@ async def create_new_donation(
     user: User = Depends(current_user),
 ):
     """Создание пожертвования. Только для авторизованных пользователей."""
+    if settings.donation_batch_window > 0:
+        return await donation_batcher.submit(donation, user)
     new_donation = await donation_crud.create(data=donation,
                                               session=session,
-                                              user=user)
-    active_projects = await charity_project_crud.get_active_objs(session)
-    session.add_all(invest(new_donation, active_projects))
+                                              user=user,
+                                              commit=False)
+    deferred = settings.invest_mode == INVEST_MODE_DEFERRED
+    if deferred:
+        await session.flush()
+    else:
+        await run_investment(new_donation, charity_project_crud, session)
+    response = DonationShortDB.from_orm(new_donation)
     await session.commit()
-    await session.refresh(new_donation)
-    return new_donation
+    if deferred:
+        investment_worker.enqueue(response.id)
+    return response
+
+
+@router.post(
+    "/bulk",
+    response_model=list[DonationImportResult],
+    response_model_exclude_none=True,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {
+                    "schema": DonationCreate.schema(),
+                },
+            },
+        },
+    },
+)
+async def import_donations_ndjson(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_user),
+):
+    """Импорт пожертвований из NDJSON: по одному `DonationCreate`
+    на строку. Корректные строки записываются одним пакетом
+    с одним проходом инвестирования, для остальных возвращается ошибка.
+    Только для авторизованных пользователей.
+    """
+    results = []
+    donations = []
+    async for line, donation in parse_ndjson(request.stream(), DonationCreate):
+        check_donation_import_size(len(results) + 1)
+        if isinstance(donation, str):
+            results.append(DonationImportResult(line=line, error=donation))
+        else:
+            results.append(DonationImportResult(line=line))
+            donations.append(donation)
+    donation_ids = iter(await import_donations(donations, user, session))
+    for result in results:
+        if result.error is None:
+            result.id = next(donation_ids)
+    return results
 
 
 @router.get(
@@ -52,10 +151,88 @@ async def create_new_donation(
     response_model_exclude_none=True,
 )
 async def get_user_donations(
+    response: Response,
+    page: PageParams = Depends(),
+    stream: Optional[StreamFormat] = Depends(get_stream_format),
+    fields: Fields = Depends(fieldset(DonationShortDB)),
+    etag: ETagHeaders = Depends(
+        conditional_get(Donation.__tablename__, per_user=True)
+    ),
+    with_total: bool = Query(
+        False,
+        description=(
+            f'Вернуть сумму всех пожертвований в `{TOTAL_AMOUNT_HEADER}`'
+        ),
+    ),
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_user),
 ):
     """Получение списка своих пожертвований.
     Только для авторизованных пользователей.
     """
-    return await donation_crud.get_user_donation(session=session, user=user)
+    if stream is not None:
+        return stream_response(
+            donation_crud.iter_user_donation_rows(
+                session, user, fields or DonationShortDB.__fields__,
+                settings.stream_chunk_size, page.after,
+            ),
+            DonationShortDB,
+            stream,
+            fields,
+            etag,
+        )
+    donations, next_cursor = await donation_crud.get_user_donation(
+        session=session, user=user, limit=page.limit, after=page.after,
+        fields=fields,
+    )
+    headers = dict(etag)
+    if with_total:
+        headers[TOTAL_AMOUNT_HEADER] = str(
+            await donation_crud.get_user_total_amount(session, user)
+        )
+    if fields is not None:
+        return sparse_response(
+            donations, DonationShortDB, fields, next_cursor, headers
+        )
+    response.headers.update(headers)
+    set_next_cursor(response, next_cursor)
+    return donations
+
+
+@router.get(
+    "/{donation_id}/allocations",
+    response_model=list[AllocationDB],
+)
+async def get_donation_allocations(
+    donation_id: int,
+    response: Response,
+    page: PageParams = Depends(),
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_user),
+):
+    """Получение журнала распределения пожертвования.
+    Только для владельца пожертвования и суперюзеров.
+    """
+    await check_donation_available(donation_id, user, session)
+    allocations, next_cursor = (
+        await allocation_crud.get_donation_allocations(
+            donation_id, session, page.limit, page.after
+        )
+    )
+    set_next_cursor(response, next_cursor)
+    return allocations
+
+
+@router.get(
+    "/{donation_id}/status",
+    response_model=DonationStatusDB,
+)
+async def get_donation_status(
+    donation_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    user: User = Depends(current_user),
+):
+    """Получение статуса распределения пожертвования.
+    Только для владельца пожертвования и суперюзеров.
+    """
+    return await check_donation_available(donation_id, user, session)
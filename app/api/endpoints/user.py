@@ -1,10 +1,79 @@
-from fastapi import APIRouter, HTTPException
+from http import HTTPStatus
 
-from app.core.user import auth_backend, fastapi_users
-from app.schemas.user import UserCreate, UserRead, UserUpdate
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi_users.authentication import JWTStrategy
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_async_session
+from app.core.user import (
+    auth_backend, current_superuser, fastapi_users, get_jwt_strategy,
+    password_hash_pool,
+)
+from app.models import User
+from app.schemas.user import (
+    PasswordHashPoolStats, RefreshBearerResponse, RefreshTokenRequest,
+    UserCreate, UserRead, UserUpdate,
+)
+from app.services.refresh_token import (
+    revoke_refresh_token, rotate_refresh_token,
+)
 
 router = APIRouter()
 
+
+@router.get(
+    '/auth/password-hash/stats',
+    response_model=PasswordHashPoolStats,
+    tags=['auth'],
+    dependencies=[Depends(current_superuser)],
+)
+async def get_password_hash_stats():
+    """Состояние пула хеширования паролей. Только для суперюзеров."""
+    return password_hash_pool.stats()
+
+
+@router.post(
+    '/auth/jwt/refresh',
+    response_model=RefreshBearerResponse,
+    tags=['auth'],
+)
+async def refresh_access_token(
+    data: RefreshTokenRequest,
+    session: AsyncSession = Depends(get_async_session),
+    strategy: JWTStrategy = Depends(get_jwt_strategy),
+):
+    """Обмен refresh-токена на новую пару токенов.
+    Предъявленный refresh-токен отзывается; повторное предъявление
+    отзывает все refresh-токены пользователя.
+    """
+    rotated = await rotate_refresh_token(data.refresh_token, session)
+    if rotated is None:
+        raise HTTPException(
+            status_code=HTTPStatus.UNAUTHORIZED.value,
+            detail='Недействительный refresh-токен!'
+        )
+    user_id, refresh_token = rotated
+    return RefreshBearerResponse(
+        access_token=await strategy.write_token(User(id=user_id)),
+        refresh_token=refresh_token,
+        token_type='bearer',
+    )
+
+
+@router.post(
+    '/auth/jwt/revoke',
+    status_code=HTTPStatus.NO_CONTENT.value,
+    response_class=Response,
+    tags=['auth'],
+)
+async def revoke_refresh_access_token(
+    data: RefreshTokenRequest,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Отзыв refresh-токена, например при выходе из приложения."""
+    await revoke_refresh_token(data.refresh_token, session)
+
+
 router.include_router(
     fastapi_users.get_auth_router(auth_backend),
     prefix='/auth/jwt',
@@ -0,0 +1,95 @@
+from typing import Callable, Dict, Optional
+
+from fastapi import Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import get_async_session
+from app.core.user import current_user
+from app.models import User
+from app.services.table_version import get_table_version
+
+ETagHeaders = Dict[str, str]
+
+
+class NotModified(Exception):
+    """Представление не изменилось с версии из `If-None-Match`."""
+
+    def __init__(self, etag: str) -> None:
+        self.etag = etag
+
+
+async def not_modified_handler(
+    request: Request,
+    exc: NotModified,
+) -> Response:
+    return Response(status_code=304, headers={'ETag': exc.etag})
+
+
+def make_etag(table: str, version: int, user_id: Optional[int]) -> str:
+    tag = f'{table}.{version}'
+    if user_id is not None:
+        tag += f'.{user_id}'
+    return f'W/"{tag}"'
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Слабое сравнение со списком тегов из `If-None-Match`."""
+    if if_none_match is None:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(',')}
+    return '*' in tags or etag.removeprefix('W/') in {
+        tag.removeprefix('W/') for tag in tags
+    }
+
+
+async def check_etag(
+    table: str,
+    user_id: Optional[int],
+    request: Request,
+    response: Response,
+    session: AsyncSession,
+) -> ETagHeaders:
+    if not settings.conditional_get:
+        return {}
+    etag = make_etag(
+        table, await get_table_version(table, session), user_id
+    )
+    if etag_matches(etag, request.headers.get('If-None-Match')):
+        raise NotModified(etag)
+    response.headers['ETag'] = etag
+    return {'ETag': etag}
+
+
+def conditional_get(
+    table: str,
+    per_user: bool = False,
+) -> Callable[..., ETagHeaders]:
+    """Зависимость условного GET по версии таблицы.
+    Включается настройкой `conditional_get`.
+    Тег строится по счетчику изменений таблицы, поэтому проверка
+    `If-None-Match` стоит одного запроса по индексу и выполняется
+    до чтения строк; при совпадении отвечает 304. Возвращает
+    заголовки для ответов, отдаваемых в обход `response_model`.
+    """
+    if per_user:
+        async def get_user_etag(
+            request: Request,
+            response: Response,
+            session: AsyncSession = Depends(get_async_session),
+            user: User = Depends(current_user),
+        ) -> ETagHeaders:
+            return await check_etag(
+                table, user.id, request, response, session
+            )
+
+        return get_user_etag
+
+    async def get_etag(
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(get_async_session),
+    ) -> ETagHeaders:
+        return await check_etag(table, None, request, response, session)
+
+    return get_etag
@@ -0,0 +1,81 @@
+from http import HTTPStatus
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel
+
+from app.api.pagination import set_next_cursor
+from app.api.serialization import dump_list, dump_rows
+from app.api.streaming import JSON_MEDIA_TYPE
+from app.core.config import settings
+
+Fields = Optional[Tuple[str, ...]]
+
+
+def fieldset(schema: Type[BaseModel]) -> Callable[..., Fields]:
+    """Зависимость для параметра `fields`: список полей схемы
+    через запятую. Без параметра возвращает None — полный ответ
+    через `response_model`, а с `fast_serialization` — все поля схемы,
+    чтобы ответ собирался из строк БД.
+    """
+    def get_fields(
+        fields: Optional[str] = Query(
+            None,
+            description=(
+                'Поля ответа через запятую: '
+                f'{", ".join(schema.__fields__)}'
+            ),
+        ),
+    ) -> Fields:
+        if fields is None:
+            if settings.fast_serialization:
+                return tuple(schema.__fields__)
+            return None
+        names = tuple(dict.fromkeys(
+            name.strip() for name in fields.split(',') if name.strip()
+        ))
+        if not names:
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY.value,
+                detail='Не указаны поля ответа!',
+            )
+        unknown = [name for name in names if name not in schema.__fields__]
+        if unknown:
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY.value,
+                detail=f'Неизвестные поля: {", ".join(unknown)}',
+            )
+        return names
+
+    return get_fields
+
+
+def sparse_response(
+    rows: List[Mapping],
+    schema: Type[BaseModel],
+    fields: Tuple[str, ...],
+    next_cursor: Optional[int] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Список из выбранных полей в обход `response_model`."""
+    response = Response(
+        dump_list(rows, schema, fields),
+        headers=headers,
+        media_type=JSON_MEDIA_TYPE,
+    )
+    set_next_cursor(response, next_cursor)
+    return response
+
+
+def sparse_object_response(
+    row: Mapping,
+    schema: Type[BaseModel],
+    fields: Tuple[str, ...],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Объект из выбранных полей в обход `response_model`."""
+    return Response(
+        dump_rows([row], schema, fields)[0],
+        headers=headers,
+        media_type=JSON_MEDIA_TYPE,
+    )
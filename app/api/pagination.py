@@ -0,0 +1,30 @@
+from typing import Optional
+
+from fastapi import Query, Response
+
+from app.core.config import settings
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+TOTAL_AMOUNT_HEADER = 'X-Total-Amount'
+
+
+class PageParams:
+    """Параметры keyset-пагинации: размер страницы и id последней записи.
+    Без `limit` список отдается целиком, как до появления пагинации.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(
+            None, ge=1, le=settings.max_page_size
+        ),
+        after: Optional[int] = Query(None, ge=0),
+    ):
+        self.limit = limit
+        self.after = after
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[int]) -> None:
+    """Передает курсор следующей страницы в заголовке ответа."""
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
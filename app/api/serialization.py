@@ -0,0 +1,43 @@
+from typing import Iterable, List, Mapping, Optional, Type
+
+import orjson
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+
+def dump_row(row: Mapping, include: Optional[set] = None) -> bytes:
+    """Строка БД в JSON через orjson, без None-полей и без схемы."""
+    return orjson.dumps({
+        key: value for key, value in row.items()
+        if value is not None and (include is None or key in include)
+    })
+
+
+def dump_rows(
+    rows: List[Mapping],
+    schema: Type[BaseModel],
+    fields: Optional[Iterable[str]] = None,
+) -> List[bytes]:
+    """Сериализовать строки БД без повторной валидации схемой.
+    С `fields` в вывод попадают только перечисленные поля.
+    С `fast_serialization` строки кодируются orjson напрямую,
+    иначе — через `schema.construct()`.
+    """
+    include = None if fields is None else set(fields)
+    if settings.fast_serialization:
+        return [dump_row(row, include) for row in rows]
+    return [
+        schema.construct(**row).json(
+            include=include, exclude_none=True
+        ).encode()
+        for row in rows
+    ]
+
+
+def dump_list(
+    rows: List[Mapping],
+    schema: Type[BaseModel],
+    fields: Optional[Iterable[str]] = None,
+) -> bytes:
+    return b'[' + b','.join(dump_rows(rows, schema, fields)) + b']'
@@ -0,0 +1,80 @@
+from enum import Enum
+from typing import (
+    AsyncIterator, Dict, Iterable, List, Mapping, Optional, Type,
+)
+
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.api.serialization import dump_rows
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+JSON_MEDIA_TYPE = 'application/json'
+
+Partitions = AsyncIterator[List[Mapping]]
+
+
+class StreamFormat(str, Enum):
+    """Формат потоковой выдачи списка."""
+    ndjson = 'ndjson'
+    json = 'json'
+
+
+def get_stream_format(
+    stream: Optional[StreamFormat] = Query(
+        None,
+        description=(
+            'Отдать весь список потоком (после `after`, без `limit`)'
+        ),
+    ),
+) -> Optional[StreamFormat]:
+    return stream
+
+
+async def encode_ndjson(
+    partitions: Partitions,
+    schema: Type[BaseModel],
+    fields: Optional[Iterable[str]] = None,
+) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        yield b''.join(
+            item + b'\n' for item in dump_rows(rows, schema, fields)
+        )
+
+
+async def encode_json_array(
+    partitions: Partitions,
+    schema: Type[BaseModel],
+    fields: Optional[Iterable[str]] = None,
+) -> AsyncIterator[bytes]:
+    yield b'['
+    separator = b''
+    async for rows in partitions:
+        if rows:
+            yield separator + b','.join(dump_rows(rows, schema, fields))
+            separator = b','
+    yield b']'
+
+
+def stream_response(
+    partitions: Partitions,
+    schema: Type[BaseModel],
+    stream_format: StreamFormat,
+    fields: Optional[Iterable[str]] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """Ответ, который сериализует строки по мере чтения из БД.
+    В памяти одновременно находится только одна порция строк.
+    """
+    if stream_format == StreamFormat.ndjson:
+        return StreamingResponse(
+            encode_ndjson(partitions, schema, fields),
+            headers=headers,
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    return StreamingResponse(
+        encode_json_array(partitions, schema, fields),
+        headers=headers,
+        media_type=JSON_MEDIA_TYPE,
+    )
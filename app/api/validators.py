@@ -1,10 +1,14 @@
+from collections import Counter
+from typing import Iterable, List, Mapping
+
 from fastapi import HTTPException
 from http import HTTPStatus
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud import charity_project_crud
-from app.models import CharityProject
+from app.core.config import settings
+from app.crud import charity_project_crud, donation_crud
+from app.models import CharityProject, Donation, User
 from app.schemas import CharityProjectUpdate
 
 
@@ -30,11 +34,13 @@ def check_charity_project_before_edit(
 async def check_charity_project_exists(
     project_id: int,
     session: AsyncSession,
+    for_update: bool = False,
 ) -> CharityProject:
     """Проверяет, что проект с переданным id существует."""
     charity_project = await charity_project_crud.get(
         obj_id=project_id,
         session=session,
+        for_update=for_update,
     )
     if charity_project is None:
         raise HTTPException(
@@ -44,6 +50,21 @@ async def check_charity_project_exists(
     return charity_project
 
 
+async def check_charity_project_row_exists(
+    project_id: int,
+    fields: Iterable[str],
+    session: AsyncSession,
+) -> Mapping:
+    """Проверяет, что проект существует, и возвращает выбранные поля."""
+    row = await charity_project_crud.get_row(project_id, session, fields)
+    if row is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND.value,
+            detail="Проект не найден!"
+        )
+    return row
+
+
 def check_charity_project_is_not_invested(
     charity_project: CharityProject,
 ) -> None:
@@ -69,3 +90,68 @@ async def check_charity_project_name_uniqueness(
             status_code=HTTPStatus.BAD_REQUEST.value,
             detail="Проект с таким именем уже существует!"
         )
+
+
+async def check_charity_project_names_uniqueness(
+    project_names: List[str],
+    session: AsyncSession,
+) -> None:
+    """Проверяет уникальность имен пакета проектов одним запросом."""
+    repeated = sorted(
+        name for name, count in Counter(project_names).items() if count > 1
+    )
+    if repeated:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST.value,
+            detail=f"Имена проектов в пакете повторяются: {repeated}!"
+        )
+    existing = await charity_project_crud.get_existing_names(
+        names=project_names,
+        session=session,
+    )
+    if existing:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST.value,
+            detail=f"Проекты с такими именами уже существуют: {existing}!"
+        )
+
+
+def check_charity_project_import_size(projects_count: int) -> None:
+    """Проверяет, что пакет проектов не превышает допустимый размер."""
+    if projects_count > settings.project_import_max_size:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE.value,
+            detail=(
+                "Пакет не может содержать больше "
+                f"{settings.project_import_max_size} проектов!"
+            )
+        )
+
+
+async def check_donation_available(
+    donation_id: int,
+    user: User,
+    session: AsyncSession,
+) -> Donation:
+    """Проверяет, что пожертвование существует и доступно пользователю."""
+    donation = await donation_crud.get(obj_id=donation_id, session=session)
+    if donation is None or (
+        donation.user_id != user.id and not user.is_superuser
+    ):
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND.value,
+            detail="Пожертвование не найдено!"
+        )
+    return donation
+
+
+def check_donation_import_size(lines_count: int) -> None:
+    """Проверяет, что импорт не превышает допустимое число строк."""
+    if lines_count > settings.donation_import_max_size:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE.value,
+            detail=(
+                "Импорт не может содержать больше "
+                f"{settings.donation_import_max_size} строк!"
+            )
+        )
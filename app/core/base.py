@@ -1,3 +1,5 @@
 """Импорты класса Base и всех моделей для Alembic."""
 from app.core.db import Base # noqa
-from app.models import CharityProject, Donation, User # noqa
+from app.models import ( # noqa
+    Allocation, CharityProject, Donation, RefreshToken, TableVersion, User
+)
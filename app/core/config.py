@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseSettings
 
@@ -7,6 +7,8 @@ class Settings(BaseSettings):
     APP_TITLE: str = 'QRKot Charity Fund'
     DATABASE_URL: str = 'sqlite+aiosqlite:///./qrkot_charity_fund.db'
     SECRET: str = 'supersecretkey'
+    connection_pool_size: int = 10
+    connection_max_overflow: int = 20
     FIRST_SUPERUSER_EMAIL: str = 'admin@example.com'
     FIRST_SUPERUSER_PASSWORD: str = 'changeme'
     type: Optional[str] = None
@@ -23,8 +25,35 @@ class Settings(BaseSettings):
     report_title: str = 'Charity projects report'
     google_drive_api_version: str = 'v3'
     google_sheets_api_version: str = 'v4'
+    google_discovery_cache_dir: str = '.google_discovery'
     sheet_row_count: int = 100
     sheet_column_count: int = 10
+    invest_engine: Literal['python', 'sql'] = 'python'
+    invest_chunk_size: int = 100
+    allocation_strategy: Literal[
+        'fifo', 'closest_to_goal', 'largest_remaining', 'proportional'
+    ] = 'fifo'
+    open_pool_cache: bool = False
+    conditional_get: bool = False
+    invest_mode: Literal['sync', 'deferred'] = 'sync'
+    invest_worker_batch_size: int = 100
+    invest_worker_max_retries: int = 3
+    invest_worker_retry_delay: float = 1
+    donation_batch_window: float = 0
+    donation_batch_max_size: int = 100
+    donation_import_max_size: int = 100000
+    project_import_max_size: int = 1000
+    max_page_size: int = 1000
+    stream_chunk_size: int = 1000
+    fast_serialization: bool = False
+    response_cache_max_bytes: int = 0
+    response_cache_ttl: float = 5.0
+    user_cache_size: int = 10000
+    user_cache_ttl: float = 30.0
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 100
+    access_token_lifetime: int = 3600
+    refresh_token_lifetime: int = 30 * 24 * 3600
 
     class Config:
         env_file = '.env'
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, declared_attr, sessionmaker
 
@@ -16,9 +17,25 @@ class PreBase:
 
 Base = declarative_base(cls=PreBase)
 
-engine = create_async_engine(settings.DATABASE_URL)
 
-AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession)
+def get_engine_options(database_url: str) -> dict:
+    """Параметры пула соединений для серверных СУБД."""
+    if make_url(database_url).get_backend_name() == 'sqlite':
+        return {}
+    return dict(
+        pool_size=settings.connection_pool_size,
+        max_overflow=settings.connection_max_overflow,
+        pool_pre_ping=True,
+    )
+
+
+engine = create_async_engine(
+    settings.DATABASE_URL, **get_engine_options(settings.DATABASE_URL)
+)
+
+AsyncSessionLocal = sessionmaker(
+    engine, class_=AsyncSession, expire_on_commit=False
+)
 
 
 async def get_async_session():
@@ -1,19 +1,34 @@
-from typing import Optional, Union
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, Union
 
-from fastapi import Depends, Request
+import jwt
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_users import (
-    BaseUserManager, FastAPIUsers, IntegerIDMixin, InvalidPasswordException
+    BaseUserManager, FastAPIUsers, IntegerIDMixin, InvalidPasswordException,
+    exceptions,
 )
 from fastapi_users.authentication import (AuthenticationBackend,
                                           BearerTransport,
                                           JWTStrategy)
+from fastapi_users.jwt import decode_jwt
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from app.core.config import settings
 from app.core.db import get_async_session
 from app.models.user import User
-from app.schemas.user import UserCreate
+from app.schemas.user import RefreshBearerResponse, UserCreate
+from app.services.refresh_token import (
+    issue_refresh_token, revoke_user_refresh_tokens,
+)
+
+T = TypeVar('T')
 
 
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
@@ -23,18 +38,247 @@ async def get_user_db(session: AsyncSession = Depends(get_async_session)):
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
 
 
-def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=settings.SECRET, lifetime_seconds=3600)
+class UserCache:
+    """Пользователи, найденные по токену, с ключом (id, токен)."""
+
+    def __init__(self) -> None:
+        self._generations: Dict[str, int] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Очистить кэш и применить текущие настройки размера и TTL."""
+        self._cache: TTLCache = TTLCache(
+            maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl
+        )
+
+    def get(self, key: Tuple[str, str]) -> Optional[User]:
+        return self._cache.get(key)
+
+    def generation(self, user_id: str) -> int:
+        return self._generations.get(user_id, 0)
+
+    def set(
+        self,
+        key: Tuple[str, str],
+        user: User,
+        generation: int,
+    ) -> None:
+        """Сохранить отсоединенную копию пользователя, если он
+        не изменялся с начала запроса.
+        """
+        if settings.user_cache_size <= 0 or (
+            generation != self.generation(key[0])
+        ):
+            return
+        copy = User(**{
+            attr.key: getattr(user, attr.key)
+            for attr in inspect(User).column_attrs
+        })
+        make_transient_to_detached(copy)
+        self._cache[key] = copy
+
+    def invalidate(self, user_id: Any) -> None:
+        """Удалить все записи пользователя."""
+        user_id = str(user_id)
+        self._generations[user_id] = self.generation(user_id) + 1
+        for key in list(self._cache.keys()):
+            if key[0] == user_id:
+                self._cache.pop(key, None)
+
+
+user_cache = UserCache()
+
 
+class CachedJWTStrategy(JWTStrategy):
+    """JWT-стратегия, которая не читает пользователя из БД,
+    если он уже найден по этому токену за последние `user_cache_ttl`
+    секунд. Копия из кэша присоединяется к сессии запроса через
+    `merge(load=False)` без запроса к БД.
+    """
 
-auth_backend = AuthenticationBackend(
+    async def read_token(
+        self,
+        token: Optional[str],
+        user_manager: BaseUserManager[User, int],
+    ) -> Optional[User]:
+        if token is None:
+            return None
+        try:
+            data: Dict[str, Any] = decode_jwt(
+                token, self.decode_key, self.token_audience,
+                algorithms=[self.algorithm],
+            )
+        except jwt.PyJWTError:
+            return None
+        key = (str(data.get('user_id')), token)
+        session = user_manager.user_db.session
+        cached = user_cache.get(key)
+        if cached is not None:
+            return await session.merge(cached, load=False)
+        generation = user_cache.generation(key[0])
+        user = await super().read_token(token, user_manager)
+        if user is not None:
+            user_cache.set(key, user, generation)
+        return user
+
+
+def get_jwt_strategy(
+    session: AsyncSession = Depends(get_async_session),
+) -> JWTStrategy:
+    strategy = CachedJWTStrategy(
+        secret=settings.SECRET,
+        lifetime_seconds=settings.access_token_lifetime,
+    )
+    strategy.session = session
+    return strategy
+
+
+class RefreshAuthenticationBackend(AuthenticationBackend):
+    """Вход выдает access-токен и refresh-токен для его обновления
+    через `/auth/jwt/refresh` без повторной проверки пароля.
+    """
+
+    async def login(
+        self,
+        strategy: CachedJWTStrategy,
+        user: User,
+        response: Response,
+    ) -> RefreshBearerResponse:
+        access_token = await strategy.write_token(user)
+        refresh_token = await issue_refresh_token(user.id, strategy.session)
+        await strategy.session.commit()
+        return RefreshBearerResponse(
+            access_token=access_token,
+            refresh_token=refresh_token,
+            token_type='bearer',
+        )
+
+
+auth_backend = RefreshAuthenticationBackend(
     name="jwt",
     transport=bearer_transport,
     get_strategy=get_jwt_strategy,
 )
 
 
+class PasswordHashPool:
+    """Пул потоков для bcrypt, чтобы хеширование не блокировало
+    цикл событий. Очередь ограничена: сверх `password_hash_max_queue`
+    ожидающих задач запрос отклоняется со статусом 503.
+    """
+
+    def __init__(self) -> None:
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.pending = 0
+        self.rejected = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                thread_name_prefix='password-hash',
+            )
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Задачи, ожидающие свободного потока."""
+        return max(0, self.pending - settings.password_hash_workers)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.queue_depth >= settings.password_hash_max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE.value,
+                detail='Сервис перегружен, повторите попытку позже!',
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, func, *args
+            )
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return dict(
+            workers=settings.password_hash_workers,
+            pending=self.pending,
+            queue_depth=self.queue_depth,
+            rejected=self.rejected,
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool()
+
+
 class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
+    """Менеджер пользователей, считающий bcrypt в `password_hash_pool`."""
+
+    async def create(
+        self,
+        user_create: UserCreate,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> User:
+        await self.validate_password(user_create.password, user_create)
+        if await self.user_db.get_by_email(user_create.email) is not None:
+            raise exceptions.UserAlreadyExists()
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        user_dict['hashed_password'] = await password_hash_pool.run(
+            self.password_helper.hash, user_dict.pop('password')
+        )
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def authenticate(
+        self, credentials: OAuth2PasswordRequestForm
+    ) -> Optional[User]:
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Хеширование выравнивает время ответа для неизвестных email.
+            await password_hash_pool.run(
+                self.password_helper.hash, credentials.password
+            )
+            return None
+        verified, updated_password_hash = await password_hash_pool.run(
+            self.password_helper.verify_and_update,
+            credentials.password,
+            user.hashed_password,
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(
+                user, {'hashed_password': updated_password_hash}
+            )
+        return user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        if 'password' in update_dict:
+            update_dict = dict(update_dict)
+            password = update_dict.pop('password')
+            await self.validate_password(password, user)
+            update_dict['hashed_password'] = await password_hash_pool.run(
+                self.password_helper.hash, password
+            )
+            # Отзыв фиксируется вместе с новым паролем; сюда же
+            # приходит сброс пароля.
+            await revoke_user_refresh_tokens(user.id, self.user_db.session)
+        return await super()._update(user, update_dict)
+
     async def validate_password(
         self, password: str, user: Union[UserCreate, User]
     ) -> None:
@@ -52,6 +296,24 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     ):
         print(f"Пользователь {user.email} зарегистрирован.")
 
+    async def on_after_update(
+            self,
+            user: User,
+            update_dict: Dict[str, Any],
+            request: Optional[Request] = None,
+    ):
+        user_cache.invalidate(user.id)
+
+    async def on_after_verify(
+            self, user: User, request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
+
+    async def on_after_reset_password(
+            self, user: User, request: Optional[Request] = None
+    ):
+        user_cache.invalidate(user.id)
+
 
 async def get_user_manager(user_db=Depends(get_user_db)):
     yield UserManager(user_db)
@@ -1,2 +1,3 @@
+from app.crud.allocation import allocation_crud # noqa
 from app.crud.charity_project import charity_project_crud # noqa
 from app.crud.donation import donation_crud # noqa
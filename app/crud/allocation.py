@@ -0,0 +1,49 @@
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models import Allocation
+
+
+class CRUDAllocation(CRUDBase):
+    """Класс для реализации уникальных методов журнала переводов."""
+
+    async def create_multi(
+        self,
+        rows: List[dict],
+        session: AsyncSession,
+    ) -> None:
+        """Записать переводы в журнал одним пакетным INSERT."""
+        if rows:
+            await session.execute(insert(self.model), rows)
+
+    async def get_project_allocations(
+        self,
+        project_id: int,
+        session: AsyncSession,
+        limit: Optional[int],
+        after: Optional[int] = None,
+    ) -> Tuple[List[Allocation], Optional[int]]:
+        """Получить переводы в благотворительный проект."""
+        return await self.get_page(
+            session, limit, after,
+            self.model.charity_project_id == project_id,
+        )
+
+    async def get_donation_allocations(
+        self,
+        donation_id: int,
+        session: AsyncSession,
+        limit: Optional[int],
+        after: Optional[int] = None,
+    ) -> Tuple[List[Allocation], Optional[int]]:
+        """Получить переводы из пожертвования."""
+        return await self.get_page(
+            session, limit, after,
+            self.model.donation_id == donation_id,
+        )
+
+
+allocation_crud = CRUDAllocation(Allocation)
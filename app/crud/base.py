@@ -1,8 +1,12 @@
-from typing import Generic, List, Optional, Type, TypeVar
+from typing import (
+    AsyncIterator, Generic, Iterable, List, Mapping, Optional, Tuple, Type,
+    TypeVar,
+)
 
 from pydantic import BaseModel
-from sqlalchemy import false, select
+from sqlalchemy import false, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
 from app.core.db import Base
 from app.models import User
@@ -23,24 +27,113 @@ class CRUDBase(Generic[ModelType, CreateSchemaType]):
         self,
         obj_id: int,
         session: AsyncSession,
+        for_update: bool = False,
     ) -> Optional[ModelType]:
         """
         Получить объект модели по id.
+        С `for_update` строка блокируется до конца транзакции.
+        """
+        stmt = select(self.model).where(self.model.id == obj_id)
+        if for_update:
+            stmt = stmt.with_for_update()
+        result = await session.execute(stmt)
+        return result.scalars().first()
+
+    def select_fields(self, fields: Iterable[str]):
+        """Запрос только выбранных полей модели; id выбирается всегда."""
+        names = list(fields)
+        if 'id' not in names:
+            names.insert(0, 'id')
+        return select(*(getattr(self.model, name) for name in names))
+
+    async def get_row(
+        self,
+        obj_id: int,
+        session: AsyncSession,
+        fields: Iterable[str],
+    ) -> Optional[Mapping]:
+        """
+        Получить выбранные поля объекта модели по id.
         """
         result = await session.execute(
-            select(self.model).where(self.model.id == obj_id)
+            self.select_fields(fields).where(self.model.id == obj_id)
         )
-        return result.scalars().first()
+        return result.mappings().first()
+
+    async def get_page(
+        self,
+        session: AsyncSession,
+        limit: Optional[int],
+        after: Optional[int] = None,
+        criterion=None,
+    ) -> Tuple[List[ModelType], Optional[int]]:
+        """
+        Получить страницу объектов модели в порядке id и курсор
+        следующей страницы. Курсор — id последнего объекта страницы,
+        None для последней страницы. Без `limit` возвращаются
+        все объекты после `after`.
+        """
+        stmt = select(self.model)
+        if criterion is not None:
+            stmt = stmt.where(criterion)
+        if after is not None:
+            stmt = stmt.where(self.model.id > after)
+        stmt = stmt.order_by(self.model.id)
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+        objs = (await session.execute(stmt)).scalars().all()
+        if limit is not None and len(objs) > limit:
+            return objs[:limit], objs[limit - 1].id
+        return objs, None
 
-    async def get_multi(
+    async def get_rows_page(
         self,
         session: AsyncSession,
-    ) -> List[ModelType]:
+        fields: Iterable[str],
+        limit: Optional[int],
+        after: Optional[int] = None,
+        criterion=None,
+    ) -> Tuple[List[Mapping], Optional[int]]:
         """
-        Получить список объектов модели.
+        Получить страницу выбранных полей объектов модели в порядке id
+        и курсор следующей страницы, как в `get_page`.
         """
-        result = await session.execute(select(self.model))
-        return result.scalars().all()
+        stmt = self.select_fields(fields)
+        if criterion is not None:
+            stmt = stmt.where(criterion)
+        if after is not None:
+            stmt = stmt.where(self.model.id > after)
+        stmt = stmt.order_by(self.model.id)
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+        rows = (await session.execute(stmt)).mappings().all()
+        if limit is not None and len(rows) > limit:
+            return rows[:limit], rows[limit - 1]['id']
+        return rows, None
+
+    async def iter_rows(
+        self,
+        session: AsyncSession,
+        fields: Iterable[str],
+        chunk_size: int,
+        after: Optional[int] = None,
+        criterion=None,
+    ) -> AsyncIterator[List[Mapping]]:
+        """
+        Порциями читать выбранные поля всех объектов модели в порядке id
+        через серверный курсор. Порция читается только по требованию.
+        """
+        stmt = self.select_fields(fields)
+        if criterion is not None:
+            stmt = stmt.where(criterion)
+        if after is not None:
+            stmt = stmt.where(self.model.id > after)
+        result = await session.stream(
+            stmt.order_by(self.model.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for rows in result.mappings().partitions(chunk_size):
+            yield rows
 
     async def create(
         self,
@@ -62,19 +155,85 @@ class CRUDBase(Generic[ModelType, CreateSchemaType]):
             await session.refresh(new_obj)
         return new_obj
 
-    async def get_active_objs(
+    async def iter_active_objs(
         self,
         session: AsyncSession,
-    ) -> List[ModelType]:
+        chunk_size: int,
+        order_by: Optional[Tuple[InstrumentedAttribute, ...]] = None,
+        descending: bool = False,
+    ) -> AsyncIterator[List[ModelType]]:
         """
-        Получить список активных объектов модели.
+        Постранично получать активные объекты модели с ненулевым
+        остатком в порядке ключа `order_by` (по умолчанию — id).
+        Последний элемент ключа должен быть уникальным.
+        Следующая страница запрашивается только по требованию.
+        Строки страницы блокируются до конца транзакции, строки,
+        заблокированные другими транзакциями, пропускаются.
+        Страницы читаются без autoflush: изменения уже прочитанных
+        строк не влияют на следующие страницы.
         """
-        result = await session.execute(
-            select(self.model)
-            .where(self.model.fully_invested == false())
-            .order_by(self.model.id)
-        )
-        return result.scalars().all()
+        key = order_by or (self.model.id,)
+        position = tuple_(*key) if len(key) > 1 else key[0]
+        last = None
+        while True:
+            query = (
+                select(self.model)
+                .where(
+                    self.model.fully_invested == false(),
+                    self.model.remaining_amount > 0,
+                )
+                .order_by(*(
+                    column.desc() if descending else column for column in key
+                ))
+                .limit(chunk_size)
+                .with_for_update(skip_locked=True)
+            )
+            if last is not None:
+                query = query.where(
+                    position < last if descending else position > last
+                )
+            with session.no_autoflush:
+                result = await session.execute(query)
+            chunk = result.scalars().all()
+            if chunk:
+                values = [getattr(chunk[-1], column.key) for column in key]
+                last = tuple_(*values) if len(key) > 1 else values[0]
+                yield chunk
+            if len(chunk) < chunk_size:
+                return
+
+    async def lock_active_ids(
+        self,
+        amount: int,
+        session: AsyncSession,
+        chunk_size: int,
+    ) -> List[int]:
+        """
+        Заблокировать открытые объекты в порядке id, пока их остатка
+        хватает на сумму `amount`. Вернуть id заблокированных объектов.
+        """
+        locked_ids = []
+        last_id = 0
+        while amount > 0:
+            result = await session.execute(
+                select(self.model.id, self.model.remaining_amount)
+                .where(
+                    self.model.fully_invested == false(),
+                    self.model.remaining_amount > 0,
+                    self.model.id > last_id,
+                )
+                .order_by(self.model.id)
+                .limit(chunk_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = result.all()
+            for row in rows:
+                locked_ids.append(row.id)
+                amount -= row.remaining_amount
+            if len(rows) < chunk_size:
+                break
+            last_id = rows[-1].id
+        return locked_ids
 
     async def update(
         self,
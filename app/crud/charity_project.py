@@ -1,11 +1,12 @@
+from datetime import datetime
 from typing import List, Optional, Tuple
 
-from sqlalchemy import func, select, true
+from sqlalchemy import func, insert, select, true
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base import CRUDBase
 from app.models import CharityProject
-from app.schemas import CharityProjectUpdate
+from app.schemas import CharityProjectCreate, CharityProjectUpdate
 
 
 class CRUDCharityRoom(CRUDBase[CharityProject, CharityProjectUpdate]):
@@ -23,6 +24,51 @@ class CRUDCharityRoom(CRUDBase[CharityProject, CharityProjectUpdate]):
             )
         ).scalars().first()
 
+    async def get_existing_names(
+        self,
+        names: List[str],
+        session: AsyncSession,
+    ) -> List[str]:
+        '''Получить названия из списка, уже занятые проектами.'''
+        return (
+            await session.execute(
+                select(self.model.name).where(self.model.name.in_(names))
+            )
+        ).scalars().all()
+
+    async def create_multi(
+        self,
+        projects: List[CharityProjectCreate],
+        session: AsyncSession,
+    ) -> List[CharityProject]:
+        '''Записать проекты одним пакетным INSERT.
+        Возвращает заблокированные новые проекты в порядке списка.
+        '''
+        create_date = datetime.now()
+        await session.execute(
+            insert(self.model),
+            [
+                dict(
+                    **project.dict(),
+                    remaining_amount=project.full_amount,
+                    create_date=create_date,
+                )
+                for project in projects
+            ],
+        )
+        return (
+            await session.execute(
+                select(self.model)
+                .where(
+                    self.model.name.in_(
+                        [project.name for project in projects]
+                    )
+                )
+                .order_by(self.model.id)
+                .with_for_update()
+            )
+        ).scalars().all()
+
     async def get_projects_by_completion_rate(
         self,
         session: AsyncSession,
@@ -1,8 +1,16 @@
-from sqlalchemy import select
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base import CRUDBase
 from app.models import Donation, User
+from app.schemas import DonationCreate, DonationShortDB
+
+IN_CLAUSE_CHUNK_SIZE = 500
+INSERT_CHUNK_SIZE = 1000
+USER_DONATION_FIELDS = tuple(DonationShortDB.__fields__)
 
 
 class CRUDDonation(CRUDBase):
@@ -11,13 +19,122 @@ class CRUDDonation(CRUDBase):
     async def get_user_donation(
         self,
         session: AsyncSession,
-        user: User
-    ) -> list[Donation]:
-        """Получить список пожертвований текущего пользователя."""
+        user: User,
+        limit: Optional[int],
+        after: Optional[int] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Tuple[List[Mapping], Optional[int]]:
+        """Получить страницу пожертвований текущего пользователя.
+        Читаются только поля `DonationShortDB` (или `fields`)
+        по индексу (user_id, id).
+        """
+        return await self.get_rows_page(
+            session, fields or USER_DONATION_FIELDS, limit, after,
+            Donation.user_id == user.id,
+        )
+
+    async def get_user_total_amount(
+        self,
+        session: AsyncSession,
+        user: User,
+    ) -> int:
+        """Получить сумму всех пожертвований текущего пользователя."""
+        return await session.scalar(
+            select(func.coalesce(func.sum(Donation.full_amount), 0))
+            .where(Donation.user_id == user.id)
+        )
+
+    def iter_user_donation_rows(
+        self,
+        session: AsyncSession,
+        user: User,
+        fields: Iterable[str],
+        chunk_size: int,
+        after: Optional[int] = None,
+    ) -> AsyncIterator[List[Mapping]]:
+        """Порциями читать пожертвования текущего пользователя."""
+        return self.iter_rows(
+            session, fields, chunk_size, after, Donation.user_id == user.id
+        )
+
+    async def get_unallocated_ids(
+        self,
+        session: AsyncSession,
+    ) -> List[int]:
+        """Получить id пожертвований, ожидающих распределения."""
         result = await session.execute(
-            select(Donation).where(Donation.user_id == user.id)
+            select(Donation.id)
+            .where(Donation.allocated_at.is_(None))
+            .order_by(Donation.id)
         )
         return result.scalars().all()
 
+    async def get_unallocated(
+        self,
+        donation_ids: List[int],
+        session: AsyncSession,
+    ) -> List[Donation]:
+        """Заблокировать и получить ожидающие распределения пожертвования.
+        Длинный список id запрашивается частями.
+        """
+        donations = []
+        for start in range(0, len(donation_ids), IN_CLAUSE_CHUNK_SIZE):
+            result = await session.execute(
+                select(Donation)
+                .where(
+                    Donation.id.in_(
+                        donation_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+                    ),
+                    Donation.allocated_at.is_(None),
+                )
+                .order_by(Donation.id)
+                .with_for_update()
+            )
+            donations.extend(result.scalars().all())
+        return sorted(donations, key=lambda donation: donation.id)
+
+    async def create_multi(
+        self,
+        donations: List[DonationCreate],
+        user: User,
+        session: AsyncSession,
+    ) -> List[int]:
+        """Записать пожертвования пакетом.
+        Возвращает id в порядке списка. Где есть RETURNING, строки
+        пишутся многострочными INSERT порциями по INSERT_CHUNK_SIZE.
+        В SQLite первая строка вставляется отдельно, остальные — одним
+        executemany: после первой вставки транзакция держит блокировку
+        записи, поэтому id пакета идут подряд за `lastrowid`.
+        """
+        create_date = datetime.now()
+        rows = [
+            dict(
+                **donation.dict(),
+                user_id=user.id,
+                remaining_amount=donation.full_amount,
+                create_date=create_date,
+            )
+            for donation in donations
+        ]
+        if not rows:
+            return []
+        if not session.bind.dialect.full_returning:
+            first_id = (
+                await session.execute(insert(Donation).values(**rows[0]))
+            ).inserted_primary_key[0]
+            if len(rows) > 1:
+                await session.execute(insert(Donation), rows[1:])
+            return list(range(first_id, first_id + len(rows)))
+        donation_ids = []
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            result = await session.execute(
+                insert(Donation)
+                .values(rows[start:start + INSERT_CHUNK_SIZE])
+                .returning(Donation.id)
+            )
+            # Id из последовательности выдаются в порядке строк VALUES.
+            donation_ids.extend(sorted(result.scalars().all()))
+        return donation_ids
+
 
 donation_crud = CRUDDonation(Donation)
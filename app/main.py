@@ -1,7 +1,32 @@
 from fastapi import FastAPI
 
 from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.core.user import password_hash_pool
+from app.api.caching import CacheHit, cache_hit_handler
+from app.api.etag import NotModified, not_modified_handler
 from app.api.routers import main_router
+from app.services.google_discovery import discovery_cache
+from app.services.invest_worker import INVEST_MODE_DEFERRED, investment_worker
+from app.services.table_version import invalidate_table_versions
 
 app = FastAPI(title=settings.APP_TITLE)
 app.include_router(main_router)
+app.add_exception_handler(NotModified, not_modified_handler)
+app.add_exception_handler(CacheHit, cache_hit_handler)
+
+
+@app.on_event('startup')
+async def startup():
+    discovery_cache.load()
+    if settings.conditional_get:
+        async with AsyncSessionLocal() as session:
+            await invalidate_table_versions(session)
+    if settings.invest_mode == INVEST_MODE_DEFERRED:
+        await investment_worker.start()
+
+
+@app.on_event('shutdown')
+async def shutdown():
+    await investment_worker.stop()
+    password_hash_pool.shutdown()
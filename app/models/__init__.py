@@ -1,3 +1,6 @@
+from .allocation import Allocation # noqa
 from .charity_project import CharityProject # noqa
 from .donation import Donation # noqa
+from .refresh_token import RefreshToken # noqa
+from .table_version import TableVersion # noqa
 from .user import User # noqa
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
+
+from app.core.db import Base
+
+
+class Allocation(Base):
+    """Модель перевода средств пожертвования в благотворительный проект."""
+    donation_id = Column(
+        Integer,
+        ForeignKey('donation.id', name='fk_allocation_donation_id_donation'),
+        nullable=False,
+    )
+    charity_project_id = Column(
+        Integer,
+        ForeignKey(
+            'charityproject.id',
+            name='fk_allocation_charity_project_id_charityproject',
+        ),
+        nullable=False,
+    )
+    amount = Column(Integer, nullable=False)
+    create_date = Column(DateTime, default=datetime.now, nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}('
+            f'{self.donation_id=}, '
+            f'{self.charity_project_id=}, '
+            f'{self.amount=}, '
+            f'{self.create_date=}'
+            ')'
+        )
+
+
+Index(
+    'ix_allocation_charity_project_id_id',
+    Allocation.charity_project_id,
+    Allocation.id,
+)
+Index('ix_allocation_donation_id_id', Allocation.donation_id, Allocation.id)
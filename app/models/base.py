@@ -1,6 +1,8 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, CheckConstraint
+from sqlalchemy import (
+    Boolean, Column, DateTime, Integer, CheckConstraint, Index, event
+)
 from sqlalchemy.sql import false
 
 from app.core.db import Base
@@ -12,15 +14,25 @@ class InvestmentBase(Base):
 
     full_amount = Column(Integer, nullable=False)
     invested_amount = Column(Integer, default=0, nullable=False)
-    fully_invested = Column(Boolean, default=false(), nullable=False)
+    fully_invested = Column(Boolean, default=False, nullable=False)
     create_date = Column(DateTime, default=datetime.now, nullable=False)
     close_date = Column(DateTime)
+    remaining_amount = Column(Integer, nullable=False)
 
     __table_args__ = (
         CheckConstraint("full_amount > 0", name="check_full_amount_positive"),
         CheckConstraint("0 <= invested_amount <= full_amount",
                         name="check_invested_amount_valid")
     )
+    __mapper_args__ = {'eager_defaults': True}
+
+    def __init__(self, **kwargs) -> None:
+        """Начальные суммы задаются сразу, а не при записи в БД:
+        новый объект можно инвестировать до первого flush.
+        """
+        kwargs.setdefault('invested_amount', 0)
+        kwargs.setdefault('fully_invested', False)
+        super().__init__(**kwargs)
 
     def __repr__(self) -> str:
         return (
@@ -32,3 +44,36 @@ class InvestmentBase(Base):
             f'{self.close_date=}'
             ')'
         )
+
+
+def open_pool_index(model) -> Index:
+    """Частичный индекс по открытым объектам модели в порядке id."""
+    is_open = model.fully_invested == false()
+    return Index(
+        f'ix_{model.__tablename__}_open_pool',
+        model.id,
+        model.remaining_amount,
+        sqlite_where=is_open,
+        postgresql_where=is_open,
+    )
+
+
+def open_pool_remaining_index(model) -> Index:
+    """Частичный индекс по открытым объектам модели в порядке остатка."""
+    is_open = model.fully_invested == false()
+    return Index(
+        f'ix_{model.__tablename__}_open_pool_remaining',
+        model.remaining_amount,
+        model.id,
+        sqlite_where=is_open,
+        postgresql_where=is_open,
+    )
+
+
+@event.listens_for(InvestmentBase, 'before_insert', propagate=True)
+@event.listens_for(InvestmentBase, 'before_update', propagate=True)
+def set_remaining_amount(mapper, connection, target) -> None:
+    """Пересчитывает остаток перед записью объекта в БД."""
+    target.remaining_amount = (
+        target.full_amount - (target.invested_amount or 0)
+    )
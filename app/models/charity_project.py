@@ -1,6 +1,8 @@
 from sqlalchemy import Column, String, Text
 
-from app.models.base import InvestmentBase
+from app.models.base import (
+    InvestmentBase, open_pool_index, open_pool_remaining_index,
+)
 
 
 class CharityProject(InvestmentBase):
@@ -13,3 +15,7 @@ class CharityProject(InvestmentBase):
             f"name={self.name}, description={self.description}, "
             f"{super().__repr__()}"
         )
+
+
+open_pool_index(CharityProject)
+open_pool_remaining_index(CharityProject)
@@ -1,6 +1,8 @@
-from sqlalchemy import Column, ForeignKey, Integer, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Text
 
-from app.models.base import InvestmentBase
+from app.models.base import (
+    InvestmentBase, open_pool_index, open_pool_remaining_index,
+)
 
 
 class Donation(InvestmentBase):
@@ -12,9 +14,21 @@ class Donation(InvestmentBase):
         ForeignKey('user.id', name='fk_donation_user_id_user')
     )
     comment = Column(Text)
+    allocated_at = Column(DateTime)
 
     def __repr__(self) -> str:
         return (
             f'user_id={self.user_id}, comment={self.comment}, '
             f'{super().__repr__()}'
         )
+
+
+open_pool_index(Donation)
+open_pool_remaining_index(Donation)
+Index(
+    'ix_donation_unallocated',
+    Donation.id,
+    sqlite_where=Donation.allocated_at.is_(None),
+    postgresql_where=Donation.allocated_at.is_(None),
+)
+Index('ix_donation_user_id_id', Donation.user_id, Donation.id)
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+
+from app.core.db import Base
+
+
+class RefreshToken(Base):
+    """Выданный refresh-токен. Отозванный токен обменять нельзя."""
+    jti = Column(String(36), unique=True, nullable=False)
+    user_id = Column(
+        Integer,
+        ForeignKey('user.id', name='fk_refreshtoken_user_id_user'),
+        nullable=False,
+    )
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime)
+    create_date = Column(DateTime, default=datetime.now, nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}('
+            f'{self.jti=}, '
+            f'{self.user_id=}, '
+            f'{self.expires_at=}, '
+            f'{self.revoked_at=}'
+            ')'
+        )
+
+
+Index('ix_refreshtoken_user_id', RefreshToken.user_id)
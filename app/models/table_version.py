@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, event
+
+from app.core.db import Base
+
+VERSIONED_TABLES = ('charityproject', 'donation')
+
+
+class TableVersion(Base):
+    """Счетчик изменений таблицы для кэшей внутри процессов."""
+    name = Column(String(100), unique=True, nullable=False)
+    version = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.name=}, {self.version=})'
+
+
+@event.listens_for(TableVersion.__table__, 'after_create')
+def seed_table_versions(target, connection, **kwargs) -> None:
+    """Счетчики создаются вместе с таблицей, как в миграции."""
+    connection.execute(target.insert(), [
+        dict(name=name, version=0) for name in VERSIONED_TABLES
+    ])
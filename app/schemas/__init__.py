@@ -1,4 +1,8 @@
+from .allocation import AllocationDB # noqa
 from .charity_project import (CharityProjectCreate, CharityProjectBase, CharityProjectDB, # noqa
                               CharityProjectUpdate)
-from .donation import DonationCreate, DonationFullDB, DonationShortDB # noqa
-from .user import UserCreate, UserRead, UserUpdate # noqa
+from .donation import (DonationCreate, DonationFullDB, DonationImportResult, # noqa
+                       DonationShortDB, DonationStatusDB)
+from .response_cache import ResponseCacheStats # noqa
+from .user import (PasswordHashPoolStats, RefreshBearerResponse, # noqa
+                   RefreshTokenRequest, UserCreate, UserRead, UserUpdate)
@@ -0,0 +1,15 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class AllocationDB(BaseModel):
+    """Pydantic-схема для вывода информации о переводе средств."""
+    id: int
+    donation_id: int
+    charity_project_id: int
+    amount: int
+    create_date: datetime
+
+    class Config:
+        orm_mode = True
@@ -24,3 +24,21 @@ class DonationShortDB(DonationCreate):
 
     class Config:
         orm_mode = True
+
+
+class DonationStatusDB(BaseModel):
+    """Pydantic-схема для вывода статуса распределения пожертвования."""
+    id: int
+    invested_amount: int
+    fully_invested: bool
+    allocated_at: Optional[datetime]
+
+    class Config:
+        orm_mode = True
+
+
+class DonationImportResult(BaseModel):
+    """Pydantic-схема результата импорта одной строки пожертвований."""
+    line: int
+    id: Optional[int]
+    error: Optional[str]
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class ResponseCacheStats(BaseModel):
+    """Pydantic-схема для вывода счетчиков кэша ответов."""
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
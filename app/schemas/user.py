@@ -1,4 +1,5 @@
 from fastapi_users import schemas
+from pydantic import BaseModel
 
 
 class UserRead(schemas.BaseUser[int]):
@@ -11,3 +12,23 @@ class UserCreate(schemas.BaseUserCreate):
 
 class UserUpdate(schemas.BaseUserUpdate):
     pass
+
+
+class PasswordHashPoolStats(BaseModel):
+    """Pydantic-схема для вывода состояния пула хеширования паролей."""
+    workers: int
+    pending: int
+    queue_depth: int
+    rejected: int
+
+
+class RefreshTokenRequest(BaseModel):
+    """Pydantic-схема для обмена и отзыва refresh-токена."""
+    refresh_token: str
+
+
+class RefreshBearerResponse(BaseModel):
+    """Pydantic-схема для вывода пары токенов."""
+    access_token: str
+    refresh_token: str
+    token_type: str
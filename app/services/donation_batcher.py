@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from http import HTTPStatus
+from typing import List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.crud import charity_project_crud, donation_crud
+from app.models import User
+from app.schemas import DonationCreate, DonationShortDB
+from app.services.invest import run_batch_investment
+from app.services.invest_worker import INVEST_MODE_DEFERRED, investment_worker
+
+logger = logging.getLogger(__name__)
+
+BatchItem = Tuple[DonationCreate, User, asyncio.Future]
+
+
+class DonationBatcher:
+    """Групповая запись пожертвований одной транзакцией.
+
+    Первый запрос в окне открывает пакет и запускает отдельную задачу,
+    которая ждет, пока истечет окно или наберется полный пакет,
+    и записывает весь пакет в своей сессии с одним проходом
+    инвестирования. Отмена любого из запросов пакета не прерывает
+    запись; каждый запрос получает свой результат или ошибку.
+    В отложенном режиме пакет только записывается, а id пожертвований
+    после коммита передаются фоновому воркеру.
+    """
+
+    def __init__(self, session_factory: sessionmaker) -> None:
+        self.session_factory = session_factory
+        self._items: List[BatchItem] = []
+        self._batch_full: Optional[asyncio.Event] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        data: DonationCreate,
+        user: User,
+    ) -> DonationShortDB:
+        """Добавить пожертвование в текущий пакет и дождаться записи."""
+        future = asyncio.get_running_loop().create_future()
+        self._items.append((data, user, future))
+        if len(self._items) == 1:
+            self._batch_full = asyncio.Event()
+            flush = asyncio.create_task(
+                self._flush(self._items, self._batch_full)
+            )
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+        elif len(self._items) >= settings.donation_batch_max_size:
+            self._batch_full.set()
+        return await future
+
+    async def _flush(
+        self,
+        items: List[BatchItem],
+        batch_full: asyncio.Event,
+    ) -> None:
+        """Дождаться окончания окна и записать пакет.
+        Запросы, не получившие результата, завершаются ошибкой 503.
+        """
+        try:
+            try:
+                await asyncio.wait_for(
+                    batch_full.wait(), settings.donation_batch_window
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._close_batch(items)
+            async with self.session_factory() as session:
+                await self._write(items, session)
+        except Exception:
+            logger.exception(
+                'Не удалось записать пакет из %s пожертвований', len(items)
+            )
+        finally:
+            self._close_batch(items)
+            for *_, future in items:
+                if not future.done():
+                    future.set_exception(HTTPException(
+                        status_code=HTTPStatus.SERVICE_UNAVAILABLE.value,
+                        detail='Пожертвование не записано, '
+                               'повторите запрос позже.'
+                    ))
+
+    def _close_batch(self, items: List[BatchItem]) -> None:
+        """Новые запросы открывают следующий пакет."""
+        if self._items is items:
+            self._items = []
+
+    @staticmethod
+    async def _write(items: List[BatchItem], session: AsyncSession) -> None:
+        """Записать пакет и передать результат каждому запросу.
+        Ошибка записи поднимается в `_flush`, который логирует ее
+        и отвечает запросам пакета ошибкой 503.
+        """
+        donations = [
+            await donation_crud.create(
+                data=data, session=session, user=user, commit=False
+            )
+            for data, user, _ in items
+        ]
+        await session.flush()
+        deferred = settings.invest_mode == INVEST_MODE_DEFERRED
+        if not deferred:
+            await run_batch_investment(
+                donations, charity_project_crud, session
+            )
+        responses = [
+            DonationShortDB.from_orm(donation) for donation in donations
+        ]
+        await session.commit()
+        for (*_, future), response in zip(items, responses):
+            if deferred:
+                investment_worker.enqueue(response.id)
+            if not future.done():
+                future.set_result(response)
+
+
+donation_batcher = DonationBatcher(AsyncSessionLocal)
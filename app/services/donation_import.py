@@ -0,0 +1,73 @@
+from typing import AsyncIterator, List, Tuple, Type, Union
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import charity_project_crud, donation_crud
+from app.models import Donation, User
+from app.schemas import DonationCreate
+from app.services.invest import run_batch_investment
+from app.services.invest_worker import INVEST_MODE_DEFERRED, investment_worker
+from app.services.pool_cache import mark_pool_stale
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return '; '.join(
+        f'{".".join(map(str, item["loc"]))}: {item["msg"]}'
+        for item in error.errors()
+    )
+
+
+async def parse_ndjson(
+    chunks: AsyncIterator[bytes],
+    schema: Type[BaseModel],
+) -> AsyncIterator[Tuple[int, Union[BaseModel, str]]]:
+    """Разбирать поток NDJSON по мере поступления.
+    Для каждой непустой строки выдается пара (номер строки, объект схемы
+    или текст ошибки валидации).
+    """
+    buffer = b''
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, parse_line(line, schema)
+    if buffer.strip():
+        yield line_number + 1, parse_line(buffer, schema)
+
+
+def parse_line(line: bytes, schema: Type[BaseModel]) -> Union[BaseModel, str]:
+    try:
+        return schema.parse_raw(line)
+    except ValidationError as error:
+        return format_validation_error(error)
+
+
+async def import_donations(
+    donations: List[DonationCreate],
+    user: User,
+    session: AsyncSession,
+) -> List[int]:
+    """Записать пожертвования пакетом и распределить их одним проходом.
+    Транзакция фиксируется один раз; возвращаются id в порядке списка.
+    """
+    if not donations:
+        return []
+    donation_ids = await donation_crud.create_multi(donations, user, session)
+    mark_pool_stale(session, Donation)
+    deferred = settings.invest_mode == INVEST_MODE_DEFERRED
+    if not deferred:
+        await run_batch_investment(
+            await donation_crud.get_unallocated(donation_ids, session),
+            charity_project_crud,
+            session,
+        )
+    await session.commit()
+    if deferred:
+        for donation_id in donation_ids:
+            investment_worker.enqueue(donation_id)
+    return donation_ids
@@ -4,6 +4,7 @@ import copy
 
 from aiogoogle import Aiogoogle
 from app.core.config import settings
+from app.services.google_discovery import discovery_cache
 
 DATETIME_FORMAT = '%Y/%m/%d %H:%M:%S'
 DEFAULT_ROW_COUNT = settings.sheet_row_count
@@ -66,9 +67,10 @@ async def set_user_permissions(
     wrapper_service: Aiogoogle,
 ) -> None:
     """Выдача прав доступа личному гугл-аккаунту к документу."""
-    service = await wrapper_service.discover(
+    service = await discovery_cache.get(
         'drive',
-        settings.google_drive_api_version
+        settings.google_drive_api_version,
+        wrapper_service,
     )
     await wrapper_service.as_service_account(
         service.permissions.create(
@@ -81,9 +83,10 @@ async def set_user_permissions(
 
 async def spreadsheets_create(wrapper_service: Aiogoogle) -> Tuple[str, str]:
     """Создание гугл-таблицы. Возвращает идентификатор и URL отчёта."""
-    service = await wrapper_service.discover(
+    service = await discovery_cache.get(
         'sheets',
-        settings.google_sheets_api_version
+        settings.google_sheets_api_version,
+        wrapper_service,
     )
     response = await wrapper_service.as_service_account(
         service.spreadsheets.create(json=build_spreadsheet_body())
@@ -97,9 +100,10 @@ async def spreadsheets_update_value(
     wrapper_service: Aiogoogle,
 ) -> None:
     """Формирование отчета в гугл-таблице на основе данных."""
-    service = await wrapper_service.discover(
+    service = await discovery_cache.get(
         'sheets',
-        settings.google_sheets_api_version
+        settings.google_sheets_api_version,
+        wrapper_service,
     )
     data_rows = [
         [
@@ -133,9 +137,10 @@ async def get_spreadsheets_from_disk(
     wrapper_service: Aiogoogle,
 ) -> List[Dict[str, str]]:
     """Получить список всех сформированных отчетов."""
-    service = await wrapper_service.discover(
+    service = await discovery_cache.get(
         'drive',
-        settings.google_drive_api_version
+        settings.google_drive_api_version,
+        wrapper_service,
     )
     q = (
         f'mimeType="application/vnd.google-apps.spreadsheet" '
@@ -149,9 +154,10 @@ async def get_spreadsheets_from_disk(
 
 async def delete_spreadsheets_from_disk(wrapper_service: Aiogoogle) -> None:
     """Удалить все отчеты с диска."""
-    service = await wrapper_service.discover(
+    service = await discovery_cache.get(
         'drive',
-        settings.google_drive_api_version
+        settings.google_drive_api_version,
+        wrapper_service,
     )
     spreadsheets = await get_spreadsheets_from_disk(
         settings.report_title,
@@ -0,0 +1,129 @@
+"""Кеш discovery-документов Google API.
+
+Документы хранятся в памяти и в каталоге `google_discovery_cache_dir`
+по ключу (имя API, версия). При старте приложения они читаются с диска,
+так что отчеты формируются без повторной загрузки схем API; документ,
+которого нет на диске, скачивается один раз при первом обращении.
+Принудительное обновление: `python -m app.services.google_discovery`.
+"""
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from aiogoogle import Aiogoogle
+from aiogoogle.resource import GoogleAPI
+
+from app.core.config import settings
+
+DiscoveryKey = Tuple[str, str]
+
+
+def get_discovery_apis() -> Tuple[DiscoveryKey, ...]:
+    """API, которые использует приложение, с версиями из настроек."""
+    return (
+        ('sheets', settings.google_sheets_api_version),
+        ('drive', settings.google_drive_api_version),
+    )
+
+
+class DiscoveryCache:
+    """Discovery-документы в памяти с копией на диске."""
+
+    def __init__(self) -> None:
+        self.services: Dict[DiscoveryKey, GoogleAPI] = {}
+        self.downloads = 0
+
+    @property
+    def directory(self) -> Path:
+        return Path(settings.google_discovery_cache_dir)
+
+    def path(self, api_name: str, api_version: str) -> Path:
+        return self.directory / f'{api_name}.{api_version}.json'
+
+    def load(self, apis: Optional[Iterable[DiscoveryKey]] = None) -> int:
+        """Прочитать с диска документы, которых еще нет в памяти.
+        Возвращает число прочитанных документов.
+        """
+        loaded = 0
+        for key in apis or get_discovery_apis():
+            path = self.path(*key)
+            if key in self.services or not path.exists():
+                continue
+            self.services[key] = GoogleAPI(
+                json.loads(path.read_text(encoding='utf-8'))
+            )
+            loaded += 1
+        return loaded
+
+    def save(self, key: DiscoveryKey, service: GoogleAPI) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(*key)
+        temp_path = path.with_suffix('.tmp')
+        temp_path.write_text(
+            json.dumps(service.discovery_document, ensure_ascii=False),
+            encoding='utf-8',
+        )
+        os.replace(temp_path, path)
+
+    async def download(
+        self,
+        key: DiscoveryKey,
+        wrapper_service: Aiogoogle,
+    ) -> GoogleAPI:
+        service = await wrapper_service.discover(*key)
+        self.save(key, service)
+        self.services[key] = service
+        self.downloads += 1
+        return service
+
+    async def get(
+        self,
+        api_name: str,
+        api_version: str,
+        wrapper_service: Aiogoogle,
+    ) -> GoogleAPI:
+        """Описание API из памяти, с диска или, в крайнем случае, из сети."""
+        key = (api_name, api_version)
+        if key not in self.services:
+            self.load([key])
+        service = self.services.get(key)
+        if service is None:
+            service = await self.download(key, wrapper_service)
+        return service
+
+    async def refresh(
+        self,
+        wrapper_service: Aiogoogle,
+        apis: Optional[Iterable[DiscoveryKey]] = None,
+    ) -> None:
+        """Скачать документы заново и перезаписать кеш."""
+        for key in apis or get_discovery_apis():
+            await self.download(key, wrapper_service)
+
+    def reset(self) -> None:
+        self.services.clear()
+        self.downloads = 0
+
+
+discovery_cache = DiscoveryCache()
+
+
+async def refresh_discovery_documents() -> None:
+    async with Aiogoogle() as wrapper_service:
+        await discovery_cache.refresh(wrapper_service)
+
+
+def main():
+    argparse.ArgumentParser(
+        description='Обновить кеш discovery-документов Google API.'
+    ).parse_args()
+    asyncio.run(refresh_discovery_documents())
+    for key in get_discovery_apis():
+        print(discovery_cache.path(*key))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,34 @@
 from datetime import datetime
+from itertools import dropwhile
+from typing import AsyncIterator, List, Optional, Tuple, Type
 
+from sqlalchemy import case, false, func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import allocation_crud
+from app.crud.base import CRUDBase
+from app.models import Allocation, Donation
 from app.models.base import InvestmentBase
+from app.services.pool_cache import mark_pool_stale, open_pool_cache
+from app.services.strategies import (
+    STRATEGIES, STRATEGY_FIFO, STRATEGY_PROPORTIONAL, AllocationStrategy,
+    FifoStrategy, ProportionalStrategy, Transfers,
+)
+
+INVEST_ENGINE_SQL = 'sql'
+ROW_LOCKING_DIALECTS = ('postgresql',)
 
 
 def invest(
     target: InvestmentBase,
-    sources: list[InvestmentBase]
+    sources: list[InvestmentBase],
+    transfers: Optional[Transfers] = None,
 ) -> list[InvestmentBase]:
-    """Процесс инвестирования без асинхронных операций и работы с сессией."""
+    """Процесс инвестирования без асинхронных операций и работы с сессией.
+    Если передан список `transfers`, в него добавляются пары
+    (источник, переведенная сумма).
+    """
     updated = []
     close_date = datetime.now()
     for source in sources:
@@ -23,6 +44,290 @@ def invest(
                 obj.fully_invested = True
                 obj.close_date = close_date
         updated.append(source)
+        if transfers is not None:
+            transfers.append((source, transfer))
         if target.fully_invested:
             break
     return updated
+
+
+def is_exhausted(source: InvestmentBase) -> bool:
+    return source.full_amount - source.invested_amount <= 0
+
+
+def allocation_sides(target: InvestmentBase, target_id, source_id) -> dict:
+    """Расставить id цели и источника по сторонам записи журнала."""
+    if isinstance(target, Donation):
+        return dict(donation_id=target_id, charity_project_id=source_id)
+    return dict(donation_id=source_id, charity_project_id=target_id)
+
+
+def build_allocations(
+    target: InvestmentBase,
+    transfers: Transfers,
+) -> List[dict]:
+    """Сформировать строки журнала переводов по результатам `invest`."""
+    create_date = datetime.now()
+    return [
+        dict(
+            **allocation_sides(target, target.id, source.id),
+            amount=amount,
+            create_date=create_date,
+        )
+        for source, amount in transfers
+        if amount > 0
+    ]
+
+
+async def save_allocations(
+    target_transfers: List[Tuple[InvestmentBase, Transfers]],
+    session: AsyncSession,
+) -> None:
+    """Записать изменения одним flush, затем переводы одним INSERT.
+    Новые цели получают id в этом же flush.
+    """
+    await session.flush()
+    await allocation_crud.create_multi(
+        [
+            allocation
+            for target, transfers in target_transfers
+            for allocation in build_allocations(target, transfers)
+        ],
+        session,
+    )
+
+
+async def invest_in_db(
+    target: InvestmentBase,
+    sources_crud: CRUDBase,
+    session: AsyncSession,
+) -> None:
+    """Процесс инвестирования силами БД.
+
+    Нарастающий итог свободных средств открытых источников считается
+    оконной функцией, переводы пишутся в журнал одним INSERT ... SELECT,
+    источники закрываются массовыми UPDATE.
+    Результат совпадает с `invest` над всем открытым пулом.
+    В СУБД с блокировками строк окно строится только по источникам,
+    заблокированным этой транзакцией.
+    """
+    need = target.full_amount - target.invested_amount
+    if need <= 0:
+        return
+    if target.id is None:
+        await session.flush()
+    source_model = sources_crud.model
+    mark_pool_stale(session, source_model)
+    remaining = source_model.remaining_amount
+    is_open = (source_model.fully_invested == false()) & (remaining > 0)
+    if session.bind.dialect.name in ROW_LOCKING_DIALECTS:
+        is_open &= source_model.id.in_(
+            await sources_crud.lock_active_ids(
+                need, session, settings.invest_chunk_size
+            )
+        )
+    pool = select(
+        source_model.id,
+        remaining.label('remaining'),
+        func.sum(remaining).over(order_by=source_model.id).label('total'),
+    ).where(is_open).subquery()
+    boundary = (
+        await session.execute(
+            select(pool.c.id, pool.c.remaining, pool.c.total)
+            .where(pool.c.total >= need)
+            .order_by(pool.c.id)
+            .limit(1)
+        )
+    ).first()
+    close_date = datetime.now()
+    await session.execute(
+        insert(Allocation).from_select(
+            ['donation_id', 'charity_project_id', 'amount', 'create_date'],
+            select(
+                *allocation_sides(
+                    target, literal(target.id), pool.c.id
+                ).values(),
+                case(
+                    (pool.c.total <= need, pool.c.remaining),
+                    else_=need - pool.c.total + pool.c.remaining,
+                ),
+                literal(close_date),
+            )
+            .where(pool.c.total - pool.c.remaining < need)
+            .order_by(pool.c.id)
+        )
+    )
+    close_values = dict(
+        invested_amount=source_model.full_amount,
+        remaining_amount=0,
+        fully_invested=True,
+        close_date=close_date,
+    )
+    close_sources = (
+        update(source_model)
+        .where(is_open)
+        .values(**close_values)
+        .execution_options(synchronize_session=False)
+    )
+    if boundary is None:
+        transfer = (
+            await session.execute(
+                select(func.coalesce(func.sum(remaining), 0)).where(is_open)
+            )
+        ).scalar()
+        await session.execute(close_sources)
+    else:
+        transfer = need
+        await session.execute(
+            close_sources.where(source_model.id < boundary.id)
+        )
+        partial = need - (boundary.total - boundary.remaining)
+        if partial == boundary.remaining:
+            values = close_values
+        else:
+            values = dict(
+                invested_amount=source_model.invested_amount + partial,
+                remaining_amount=remaining - partial,
+            )
+        await session.execute(
+            update(source_model)
+            .where(source_model.id == boundary.id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+    target.invested_amount += transfer
+    if target.invested_amount >= target.full_amount:
+        target.fully_invested = True
+        target.close_date = close_date
+
+
+async def run_batch_investment(
+    targets: List[InvestmentBase],
+    sources_crud: CRUDBase,
+    session: AsyncSession,
+) -> None:
+    """Распределить средства нескольких объектов в порядке списка.
+    Пожертвования-цели отмечаются как распределенные.
+    Цели могут быть еще не записаны в БД: они попадут в тот же flush,
+    что и измененные источники.
+    """
+    allocated_at = datetime.now()
+    for target in targets:
+        if isinstance(target, Donation):
+            target.allocated_at = allocated_at
+    strategy = settings.allocation_strategy
+    if strategy == STRATEGY_PROPORTIONAL:
+        await invest_proportionally(targets, sources_crud, session)
+    elif strategy != STRATEGY_FIFO:
+        await invest_from_pages(
+            targets, sources_crud, session, STRATEGIES[strategy]
+        )
+    elif settings.invest_engine == INVEST_ENGINE_SQL:
+        for target in targets:
+            await invest_in_db(target, sources_crud, session)
+    else:
+        await invest_from_pages(targets, sources_crud, session)
+
+
+async def iter_source_pages(
+    targets: List[InvestmentBase],
+    sources_crud: CRUDBase,
+    session: AsyncSession,
+    strategy: Type[AllocationStrategy] = FifoStrategy,
+) -> AsyncIterator[List[InvestmentBase]]:
+    """Страницы открытого пула в порядке стратегии.
+    При включенном кэше пула порядок по id читается только
+    из строк, нужных целям.
+    """
+    if settings.open_pool_cache and strategy is FifoStrategy:
+        sources = await open_pool_cache.get_sources(
+            sources_crud.model,
+            sum(target.full_amount - target.invested_amount
+                for target in targets),
+            session,
+        )
+        if sources is not None:
+            if sources:
+                yield sources
+            return
+    async for page in sources_crud.iter_active_objs(
+        session,
+        settings.invest_chunk_size,
+        strategy.priority(sources_crud.model),
+        strategy.descending,
+    ):
+        yield page
+
+
+async def invest_from_pages(
+    targets: List[InvestmentBase],
+    sources_crud: CRUDBase,
+    session: AsyncSession,
+    strategy: Type[AllocationStrategy] = FifoStrategy,
+) -> None:
+    """Распределить средства целей по страницам открытого пула.
+    Если стратегия сохраняет порядок пула, пул читается один раз:
+    каждая цель продолжает с того места, где остановилась предыдущая.
+    Иначе изменения записываются и пул перечитывается для каждой цели.
+    Исчерпанные источники всегда образуют начало страницы
+    и отбрасываются.
+    """
+    pages = iter_source_pages(targets, sources_crud, session, strategy)
+    sources = []
+    target_transfers = []
+    for target in targets:
+        if not strategy.keeps_order and target_transfers:
+            await pages.aclose()
+            await session.flush()
+            pages = iter_source_pages(
+                [target], sources_crud, session, strategy
+            )
+            sources = []
+        transfers = []
+        while not target.fully_invested:
+            if not sources:
+                try:
+                    sources = await pages.__anext__()
+                except StopAsyncIteration:
+                    break
+            updated = invest(target, sources, transfers)
+            if not updated:
+                # На странице не осталось свободных средств.
+                sources = []
+                continue
+            session.add_all(updated)
+            sources = list(dropwhile(is_exhausted, sources))
+        target_transfers.append((target, transfers))
+    await save_allocations(target_transfers, session)
+
+
+async def invest_proportionally(
+    targets: List[InvestmentBase],
+    sources_crud: CRUDBase,
+    session: AsyncSession,
+) -> None:
+    """Распределить средства целей пропорционально остаткам источников.
+    Каждый открытый источник получает долю, поэтому открытый пул
+    загружается целиком и один раз на весь пакет целей.
+    """
+    sources = []
+    async for page in sources_crud.iter_active_objs(
+        session, settings.invest_chunk_size
+    ):
+        sources.extend(page)
+    strategy = ProportionalStrategy(sources)
+    target_transfers = []
+    for target in targets:
+        transfers = []
+        session.add_all(strategy.fill(target, transfers))
+        target_transfers.append((target, transfers))
+    await save_allocations(target_transfers, session)
+
+
+async def run_investment(
+    target: InvestmentBase,
+    sources_crud: CRUDBase,
+    session: AsyncSession,
+) -> None:
+    """Распределить средства объекта движком, выбранным в настройках."""
+    await run_batch_investment([target], sources_crud, session)
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.crud import charity_project_crud, donation_crud
+from app.services.invest import run_batch_investment
+
+INVEST_MODE_DEFERRED = 'deferred'
+
+logger = logging.getLogger(__name__)
+
+
+class InvestmentWorker:
+    """Фоновое распределение пожертвований внутри процесса.
+
+    Очередь хранит id пожертвований, уже записанных в БД. Признак
+    ожидания (`allocated_at IS NULL`) хранится в БД, поэтому при запуске
+    воркер сначала забирает работу, оставшуюся с прошлого запуска.
+    Неудачный пакет возвращается в очередь с растущей задержкой;
+    после `invest_worker_max_retries` попыток пожертвования остаются
+    ожидающими до следующего запуска.
+    """
+
+    def __init__(self, session_factory: sessionmaker) -> None:
+        self.session_factory = session_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._attempts: Dict[int, int] = {}
+
+    async def start(self) -> None:
+        """Поставить в очередь ожидающие пожертвования и запустить воркер."""
+        self._queue = asyncio.Queue()
+        self._attempts = {}
+        async with self.session_factory() as session:
+            for donation_id in await donation_crud.get_unallocated_ids(
+                session
+            ):
+                self._queue.put_nowait(donation_id)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить воркер. Необработанные id останутся ожидающими в БД."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue = None
+
+    def enqueue(self, donation_id: int) -> None:
+        """Поставить пожертвование в очередь на распределение."""
+        if self._queue is not None:
+            self._queue.put_nowait(donation_id)
+
+    async def join(self) -> None:
+        """Дождаться распределения всех пожертвований из очереди."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _run(self) -> None:
+        while True:
+            donation_ids = [await self._queue.get()]
+            while (
+                len(donation_ids) < settings.invest_worker_batch_size and
+                not self._queue.empty()
+            ):
+                donation_ids.append(self._queue.get_nowait())
+            try:
+                await self._allocate(donation_ids)
+            except Exception:
+                logger.exception(
+                    'Не удалось распределить пожертвования %s', donation_ids
+                )
+                await self._retry(donation_ids)
+            else:
+                for donation_id in donation_ids:
+                    self._attempts.pop(donation_id, None)
+            finally:
+                for _ in donation_ids:
+                    self._queue.task_done()
+
+    async def _retry(self, donation_ids: List[int]) -> None:
+        """Вернуть неудачный пакет в очередь после задержки."""
+        attempt = max(
+            self._attempts.get(donation_id, 0) for donation_id in donation_ids
+        ) + 1
+        if attempt > settings.invest_worker_max_retries:
+            logger.error(
+                'Пожертвования %s оставлены ожидающими до перезапуска',
+                donation_ids,
+            )
+            for donation_id in donation_ids:
+                self._attempts.pop(donation_id, None)
+            return
+        await asyncio.sleep(
+            settings.invest_worker_retry_delay * 2 ** (attempt - 1)
+        )
+        for donation_id in donation_ids:
+            self._attempts[donation_id] = attempt
+            self._queue.put_nowait(donation_id)
+
+    async def _allocate(self, donation_ids: List[int]) -> None:
+        """Распределить пакет пожертвований в одной транзакции."""
+        async with self.session_factory() as session:
+            donations = await donation_crud.get_unallocated(
+                donation_ids, session
+            )
+            await run_batch_investment(
+                donations, charity_project_crud, session
+            )
+            await session.commit()
+
+
+investment_worker = InvestmentWorker(AsyncSessionLocal)
@@ -0,0 +1,171 @@
+"""Кэш открытого пула внутри процесса.
+
+Для каждой таблицы хранятся id открытых объектов и их остатки в порядке
+id, а также номер версии таблицы из `tableversion`
+(см. `app.services.table_version`). После фиксации
+кэш обновляется изменениями транзакции, если до нее он отражал
+предыдущую версию; иначе (изменения из другого процесса, массовые
+UPDATE, откат) записи таблицы сбрасываются.
+"""
+from typing import Dict, List, Optional, Type
+
+from sqlalchemy import event, false, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.base import InvestmentBase
+from app.services.table_version import (
+    TABLE_VERSIONS, get_table_version, mark_table_changed,
+)
+
+POOL_CHANGES = 'open_pool_changes'
+POOL_STALE = 'open_pool_stale'
+
+
+class OpenPoolCache:
+    """Открытые объекты и остатки по таблицам в порядке id."""
+
+    def __init__(self) -> None:
+        self._pools: Dict[str, Dict[int, int]] = {}
+        self._versions: Dict[str, int] = {}
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Сбросить кэш таблицы или всех таблиц."""
+        if table is None:
+            self._pools.clear()
+            self._versions.clear()
+        else:
+            self._pools.pop(table, None)
+            self._versions.pop(table, None)
+
+    def apply(
+        self,
+        table: str,
+        version: int,
+        changes: Optional[Dict[int, Optional[int]]],
+    ) -> None:
+        """Применить изменения зафиксированной транзакции."""
+        if changes is None or self._versions.get(table) != version - 1:
+            self.invalidate(table)
+            return
+        pool = self._pools[table]
+        last_id = next(reversed(pool), 0)
+        resort = False
+        for obj_id, remaining in changes.items():
+            if remaining is None:
+                pool.pop(obj_id, None)
+                continue
+            resort |= obj_id not in pool and obj_id < last_id
+            pool[obj_id] = remaining
+        if resort:
+            self._pools[table] = dict(sorted(pool.items()))
+        self._versions[table] = version
+
+    async def get_sources(
+        self,
+        model: Type[InvestmentBase],
+        need: int,
+        session: AsyncSession,
+    ) -> Optional[List[InvestmentBase]]:
+        """Загрузить первые открытые объекты, покрывающие сумму `need`.
+
+        Из БД читаются только строки, выбранные по кэшу. Строки,
+        заблокированные другой транзакцией, пропускаются, как и в
+        `iter_active_objs`. Если прочитанное расходится с кэшем
+        (в том числе из-за пропуска), кэш сбрасывается и возвращается
+        None.
+        """
+        table = model.__tablename__
+        info = session.sync_session.info
+        if table in info.get(POOL_CHANGES, {}) or table in info.get(
+            POOL_STALE, set()
+        ):
+            return None
+        version = await get_table_version(table, session)
+        if self._versions.get(table) != version:
+            rows = await session.execute(
+                select(model.id, model.remaining_amount)
+                .where(
+                    model.fully_invested == false(),
+                    model.remaining_amount > 0,
+                )
+                .order_by(model.id)
+            )
+            self._pools[table] = dict(rows.all())
+            self._versions[table] = version
+        expected = []
+        total = 0
+        for obj_id, remaining in self._pools[table].items():
+            if total >= need:
+                break
+            expected.append((obj_id, remaining))
+            total += remaining
+        if not expected:
+            return []
+        sources = (
+            await session.execute(
+                select(model)
+                .where(model.id.in_([obj_id for obj_id, _ in expected]))
+                .order_by(model.id)
+                .with_for_update(skip_locked=True)
+            )
+        ).scalars().all()
+        if [
+            (source.id, source.full_amount - source.invested_amount)
+            for source in sources
+            if not source.fully_invested
+        ] != expected:
+            self.invalidate(table)
+            return None
+        return sources
+
+
+def mark_pool_stale(
+    session: AsyncSession,
+    model: Type[InvestmentBase],
+) -> None:
+    """Отметить таблицу измененной в обход ORM: кэш будет сброшен."""
+    mark_table_changed(session, model)
+    if settings.open_pool_cache:
+        session.sync_session.info.setdefault(POOL_STALE, set()).add(
+            model.__tablename__
+        )
+
+
+@event.listens_for(Session, 'after_flush')
+def collect_pool_changes(session: Session, flush_context) -> None:
+    if not settings.open_pool_cache:
+        return
+    changes = session.info.setdefault(POOL_CHANGES, {})
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, InvestmentBase):
+            remaining = obj.full_amount - obj.invested_amount
+            changes.setdefault(obj.__tablename__, {})[obj.id] = (
+                remaining
+                if not obj.fully_invested and remaining > 0 else None
+            )
+    for obj in session.deleted:
+        if isinstance(obj, InvestmentBase):
+            changes.setdefault(obj.__tablename__, {})[obj.id] = None
+
+
+@event.listens_for(Session, 'after_commit')
+def apply_pool_changes(session: Session) -> None:
+    changes = session.info.pop(POOL_CHANGES, {})
+    stale = session.info.pop(POOL_STALE, set())
+    for table, version in session.info.pop(TABLE_VERSIONS, {}).items():
+        open_pool_cache.apply(
+            table, version, None if table in stale else changes.get(table)
+        )
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_pool_changes(session: Session) -> None:
+    tables = set(session.info.pop(POOL_CHANGES, {}))
+    tables |= session.info.pop(POOL_STALE, set())
+    for table in tables:
+        open_pool_cache.invalidate(table)
+
+
+open_pool_cache = OpenPoolCache()
@@ -0,0 +1,28 @@
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import charity_project_crud, donation_crud
+from app.models import CharityProject
+from app.schemas import CharityProjectCreate, CharityProjectDB
+from app.services.invest import run_batch_investment
+from app.services.pool_cache import mark_pool_stale
+
+
+async def import_charity_projects(
+    projects: List[CharityProjectCreate],
+    session: AsyncSession,
+) -> List[CharityProjectDB]:
+    """Записать проекты пакетом и распределить между ними свободные
+    пожертвования одним проходом. Транзакция фиксируется один раз.
+    """
+    if not projects:
+        return []
+    new_projects = await charity_project_crud.create_multi(projects, session)
+    mark_pool_stale(session, CharityProject)
+    await run_batch_investment(new_projects, donation_crud, session)
+    response = [
+        CharityProjectDB.from_orm(project) for project in new_projects
+    ]
+    await session.commit()
+    return response
@@ -0,0 +1,271 @@
+"""Офлайн-пересчет распределения средств всего фонда.
+
+Пожертвования и проекты загружаются в колоночные массивы NumPy,
+FIFO-сопоставление считается нарастающими итогами и `searchsorted`.
+Запуск: `python -m app.services.rebalance [--apply]`.
+Пересчет воспроизводит только стратегию `fifo`.
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from typing import Dict, Tuple, Type
+
+import numpy as np
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.models import Allocation, CharityProject, Donation
+from app.models.base import InvestmentBase
+from app.services.pool_cache import mark_pool_stale
+from app.services.strategies import STRATEGY_FIFO
+
+Columns = Dict[str, np.ndarray]
+
+DATETIME_DTYPE = 'datetime64[us]'
+DIFF_SAMPLE_SIZE = 10
+FUND_COLUMNS = (
+    'id',
+    'full_amount',
+    'invested_amount',
+    'fully_invested',
+    'create_date',
+    'close_date',
+)
+
+
+async def load_columns(
+    model: Type[InvestmentBase],
+    session: AsyncSession,
+) -> Columns:
+    """Загрузить объекты модели в колоночные массивы в порядке id."""
+    rows = (
+        await session.execute(
+            select(*(getattr(model, name) for name in FUND_COLUMNS))
+            .order_by(model.id)
+        )
+    ).all()
+    values = list(zip(*rows)) or [()] * len(FUND_COLUMNS)
+    columns = dict(zip(FUND_COLUMNS, values))
+    return dict(
+        id=np.array(columns['id'], dtype=np.int64),
+        full_amount=np.array(columns['full_amount'], dtype=np.int64),
+        invested_amount=np.array(columns['invested_amount'], dtype=np.int64),
+        fully_invested=np.array(columns['fully_invested'], dtype=bool),
+        create_date=np.array(columns['create_date'], dtype=DATETIME_DTYPE),
+        close_date=np.array(columns['close_date'], dtype=DATETIME_DTYPE),
+    )
+
+
+def match_side(side: Columns, other: Columns, matched: int) -> Columns:
+    """Рассчитать новое состояние одной стороны FIFO-сопоставления.
+
+    Дата закрытия — момент появления объекта, который покрыл последнюю
+    единицу суммы. Для уже закрытых объектов прежняя дата сохраняется.
+    """
+    end = np.cumsum(side['full_amount'])
+    invested = np.clip(matched - (end - side['full_amount']), 0,
+                       side['full_amount'])
+    fully_invested = invested == side['full_amount']
+    close_date = np.full(end.size, np.datetime64('NaT'), DATETIME_DTYPE)
+    if matched:
+        closer = np.searchsorted(
+            np.cumsum(other['full_amount']), end[fully_invested]
+        )
+        close_date[fully_invested] = np.maximum(
+            side['create_date'][fully_invested],
+            other['create_date'][closer],
+        )
+    keep = (
+        fully_invested & side['fully_invested'] &
+        ~np.isnat(side['close_date'])
+    )
+    close_date[keep] = side['close_date'][keep]
+    changed = (
+        (invested != side['invested_amount']) |
+        (fully_invested != side['fully_invested']) |
+        ((close_date != side['close_date']) &
+         ~(np.isnat(close_date) & np.isnat(side['close_date'])))
+    )
+    return dict(
+        id=side['id'],
+        full_amount=side['full_amount'],
+        invested_amount=invested,
+        fully_invested=fully_invested,
+        close_date=close_date,
+        changed=changed,
+    )
+
+
+def match_allocations(
+    donations: Columns,
+    projects: Columns,
+    matched: int,
+) -> Columns:
+    """Разбить сопоставленную сумму на переводы «пожертвование → проект»."""
+    donation_end = np.cumsum(donations['full_amount'])
+    project_end = np.cumsum(projects['full_amount'])
+    bounds = np.union1d(
+        donation_end[donation_end <= matched],
+        project_end[project_end <= matched],
+    )
+    donation_index = np.searchsorted(donation_end, bounds)
+    project_index = np.searchsorted(project_end, bounds)
+    return dict(
+        donation_id=donations['id'][donation_index],
+        charity_project_id=projects['id'][project_index],
+        amount=np.diff(bounds, prepend=0),
+        create_date=np.maximum(
+            donations['create_date'][donation_index],
+            projects['create_date'][project_index],
+        ),
+    )
+
+
+def plan_rebalance(
+    donations: Columns,
+    projects: Columns,
+) -> Tuple[Columns, Columns, Columns]:
+    """Рассчитать состояние пожертвований, проектов и журнал переводов."""
+    matched = int(min(
+        donations['full_amount'].sum(), projects['full_amount'].sum()
+    ))
+    return (
+        match_side(donations, projects, matched),
+        match_side(projects, donations, matched),
+        match_allocations(donations, projects, matched),
+    )
+
+
+def format_diff(title: str, old: Columns, new: Columns) -> str:
+    """Сформировать отчет об изменениях одной таблицы."""
+    changed = np.flatnonzero(new['changed'])
+    lines = [f'{title}: изменится {changed.size} из {new["id"].size}']
+    for index in changed[:DIFF_SAMPLE_SIZE]:
+        lines.append(
+            f'  id={new["id"][index]}: '
+            f'invested_amount {old["invested_amount"][index]} -> '
+            f'{new["invested_amount"][index]}, '
+            f'fully_invested {old["fully_invested"][index]} -> '
+            f'{new["fully_invested"][index]}'
+        )
+    if changed.size > DIFF_SAMPLE_SIZE:
+        lines.append(f'  ... и еще {changed.size - DIFF_SAMPLE_SIZE}')
+    return '\n'.join(lines)
+
+
+async def write_side(
+    model: Type[InvestmentBase],
+    new: Columns,
+    session: AsyncSession,
+) -> None:
+    """Записать измененные строки одной таблицы пакетным UPDATE."""
+    changed = np.flatnonzero(new['changed'])
+    if not changed.size:
+        return
+    table = model.__table__
+    await session.execute(
+        update(table)
+        .where(table.c.id == bindparam('b_id'))
+        .values(
+            invested_amount=bindparam('b_invested_amount'),
+            remaining_amount=bindparam('b_remaining_amount'),
+            fully_invested=bindparam('b_fully_invested'),
+            close_date=bindparam('b_close_date'),
+        ),
+        [
+            dict(
+                b_id=int(new['id'][index]),
+                b_invested_amount=int(new['invested_amount'][index]),
+                b_remaining_amount=int(
+                    new['full_amount'][index] -
+                    new['invested_amount'][index]
+                ),
+                b_fully_invested=bool(new['fully_invested'][index]),
+                b_close_date=new['close_date'][index].item(),
+            )
+            for index in changed
+        ],
+    )
+
+
+async def write_allocations(
+    allocations: Columns,
+    session: AsyncSession,
+) -> None:
+    """Перезаписать журнал переводов."""
+    await session.execute(delete(Allocation))
+    if allocations['amount'].size:
+        await session.execute(
+            insert(Allocation),
+            [
+                dict(
+                    donation_id=int(donation_id),
+                    charity_project_id=int(project_id),
+                    amount=int(amount),
+                    create_date=create_date.item(),
+                )
+                for donation_id, project_id, amount, create_date in zip(
+                    allocations['donation_id'],
+                    allocations['charity_project_id'],
+                    allocations['amount'],
+                    allocations['create_date'],
+                )
+            ],
+        )
+
+
+async def rebalance(session: AsyncSession, apply: bool = False) -> str:
+    """Пересчитать фонд и вернуть отчет. С `apply` записать результат."""
+    donations = await load_columns(Donation, session)
+    projects = await load_columns(CharityProject, session)
+    new_donations, new_projects, allocations = plan_rebalance(
+        donations, projects
+    )
+    report = '\n'.join((
+        format_diff('Пожертвования', donations, new_donations),
+        format_diff('Проекты', projects, new_projects),
+        f'Журнал переводов: {allocations["amount"].size} записей',
+    ))
+    if apply:
+        mark_pool_stale(session, Donation)
+        mark_pool_stale(session, CharityProject)
+        await write_side(Donation, new_donations, session)
+        await write_side(CharityProject, new_projects, session)
+        await write_allocations(allocations, session)
+        await session.execute(
+            update(Donation)
+            .where(Donation.allocated_at.is_(None))
+            .values(allocated_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Пересчет распределения средств всего фонда.'
+    )
+    parser.add_argument(
+        '--apply',
+        action='store_true',
+        help='записать результат в БД (по умолчанию только отчет)',
+    )
+    args = parser.parse_args()
+    if settings.allocation_strategy != STRATEGY_FIFO:
+        parser.error(
+            'пересчет поддерживает только стратегию распределения '
+            f'`{STRATEGY_FIFO}`'
+        )
+
+    async def run() -> None:
+        async with AsyncSessionLocal() as session:
+            print(await rebalance(session, apply=args.apply))
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Refresh-токены с ротацией.
+
+Refresh-токен — JWT с собственной аудиторией и `jti`; серверная
+таблица `refreshtoken` хранит выданные `jti` и отметки отзыва.
+Обмен проверяет подпись и одним условным UPDATE по уникальному `jti`
+отзывает предъявленный токен, после чего выдается новый. Повторное
+предъявление отозванного токена считается утечкой: отзываются все
+токены пользователя.
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+import jwt
+from fastapi_users.jwt import decode_jwt, generate_jwt
+from sqlalchemy import insert, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import RefreshToken, User
+
+REFRESH_TOKEN_AUDIENCE = ['qrkot:refresh']
+
+
+async def issue_refresh_token(user_id: int, session: AsyncSession) -> str:
+    """Выдать refresh-токен; фиксация транзакции — за вызывающим."""
+    jti = str(uuid.uuid4())
+    await session.execute(insert(RefreshToken).values(
+        jti=jti,
+        user_id=user_id,
+        expires_at=datetime.now() + timedelta(
+            seconds=settings.refresh_token_lifetime
+        ),
+    ))
+    return generate_jwt(
+        {'user_id': str(user_id), 'jti': jti, 'aud': REFRESH_TOKEN_AUDIENCE},
+        settings.SECRET,
+        settings.refresh_token_lifetime,
+    )
+
+
+def read_refresh_token(token: str) -> Optional[dict]:
+    """Проверить подпись и срок токена без обращения к БД."""
+    try:
+        data = decode_jwt(token, settings.SECRET, REFRESH_TOKEN_AUDIENCE)
+        return dict(user_id=int(data['user_id']), jti=str(data['jti']))
+    except (jwt.PyJWTError, KeyError, ValueError):
+        return None
+
+
+async def rotate_refresh_token(
+    token: str,
+    session: AsyncSession,
+) -> Optional[Tuple[int, str]]:
+    """Обменять refresh-токен на новый.
+    Возвращает (id пользователя, новый refresh-токен) или None,
+    если токен неверен, просрочен, отозван или пользователь неактивен.
+    """
+    data = read_refresh_token(token)
+    if data is None:
+        return None
+    now = datetime.now()
+    result = await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.jti == data['jti'],
+            RefreshToken.user_id == data['user_id'],
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+            RefreshToken.user_id.in_(
+                select(User.id).where(User.is_active == true())
+            ),
+        )
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        await revoke_user_refresh_tokens(data['user_id'], session)
+        await session.commit()
+        return None
+    new_token = await issue_refresh_token(data['user_id'], session)
+    await session.commit()
+    return data['user_id'], new_token
+
+
+async def revoke_refresh_token(token: str, session: AsyncSession) -> None:
+    """Отозвать refresh-токен, если он действителен."""
+    data = read_refresh_token(token)
+    if data is None:
+        return
+    await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.jti == data['jti'],
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=datetime.now())
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+
+async def revoke_user_refresh_tokens(
+    user_id: int,
+    session: AsyncSession,
+) -> None:
+    """Отозвать все действующие refresh-токены пользователя."""
+    await session.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=datetime.now())
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,155 @@
+"""Кэш сериализованных ответов внутри процесса.
+
+Записи хранят тело ответа и его заголовки, размер кэша ограничен
+суммарным размером тел, срок жизни записи — `response_cache_ttl`.
+После фиксации транзакции, изменившей таблицу, записи ее списков
+и записи измененных объектов удаляются; если id изменений неизвестны
+(массовые UPDATE), удаляются все записи таблицы. Изменения из других
+процессов видны не позже, чем через `response_cache_ttl`.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.base import InvestmentBase
+from app.services.table_version import BULK_CHANGED_TABLES, CHANGED_TABLES
+
+CHANGED_IDS = 'response_cache_changed_ids'
+COMMITTED_CHANGES = 'response_cache_committed_changes'
+
+CacheKey = Tuple[str, Optional[int], str]
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    headers: Dict[str, str]
+
+
+class EvictionCountingCache(TTLCache):
+    """TTLCache, считающий вытеснения по размеру."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.evictions = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+
+class ResponseCache:
+    """Ответы по ключу (таблица, id объекта или None для списка, URL)."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._generations: Dict[str, int] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Очистить кэш и применить текущие настройки размера и TTL."""
+        self._cache = EvictionCountingCache(
+            maxsize=settings.response_cache_max_bytes,
+            ttl=settings.response_cache_ttl,
+            getsizeof=lambda entry: len(entry.body),
+        )
+        self.hits = self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.response_cache_max_bytes > 0
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def generation(self, table: str) -> int:
+        return self._generations.get(table, 0)
+
+    def set(
+        self,
+        key: CacheKey,
+        entry: CachedResponse,
+        generation: int,
+    ) -> None:
+        """Сохранить ответ, если таблица не менялась с начала запроса."""
+        if generation != self.generation(key[0]):
+            return
+        try:
+            self._cache[key] = entry
+        except ValueError:
+            pass
+
+    def invalidate(
+        self,
+        table: str,
+        ids: Optional[Iterable[int]] = None,
+    ) -> None:
+        """Удалить записи таблицы: списки и объекты `ids` или все."""
+        self._generations[table] = self.generation(table) + 1
+        ids = None if ids is None else set(ids)
+        for key in list(self._cache.keys()):
+            if key[0] == table and (
+                ids is None or key[1] is None or key[1] in ids
+            ):
+                self._cache.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self._cache.evictions,
+            entries=len(self._cache),
+            size=self._cache.currsize,
+        )
+
+
+@event.listens_for(Session, 'after_flush')
+def collect_changed_ids(session: Session, flush_context) -> None:
+    if not response_cache.enabled:
+        return
+    changed = session.info.setdefault(CHANGED_IDS, {})
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, InvestmentBase):
+            changed.setdefault(obj.__tablename__, set()).add(obj.id)
+
+
+@event.listens_for(Session, 'before_commit')
+def remember_committed_changes(session: Session) -> None:
+    # Изменения, еще не отправленные в БД, попадают в CHANGED_IDS
+    # и CHANGED_TABLES только при flush: не полагаемся на то, что
+    # слушатель версий таблиц уже выполнил его.
+    session.flush()
+    changed = session.info.pop(CHANGED_IDS, {})
+    tables: Set[str] = session.info.get(CHANGED_TABLES, set())
+    bulk: Set[str] = session.info.get(BULK_CHANGED_TABLES, set())
+    if response_cache.enabled and tables:
+        session.info[COMMITTED_CHANGES] = {
+            table: None if table in bulk else changed.get(table)
+            for table in tables
+        }
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_committed_changes(session: Session) -> None:
+    for table, ids in session.info.pop(COMMITTED_CHANGES, {}).items():
+        response_cache.invalidate(table, ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_changed_ids(session: Session) -> None:
+    session.info.pop(CHANGED_IDS, None)
+    session.info.pop(COMMITTED_CHANGES, None)
+
+
+response_cache = ResponseCache()
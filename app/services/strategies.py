@@ -0,0 +1,141 @@
+"""Стратегии распределения средств между целью и открытым пулом.
+
+Стратегия по умолчанию `fifo` — исторический порядок по id, его
+исполняют движки из `app.services.invest`. Жадные стратегии задают
+порядок открытого пула ключом сортировки: пул читается постранично
+в этом порядке по частичным индексам (`open_pool_index`,
+`open_pool_remaining_index`), поэтому он не загружается целиком
+и не пересортировывается для каждой цели. Пропорциональной стратегии
+по определению нужен весь открытый пул.
+"""
+import heapq
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Tuple, Type
+
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.models.base import InvestmentBase
+
+STRATEGY_FIFO = 'fifo'
+STRATEGY_PROPORTIONAL = 'proportional'
+
+Transfers = List[Tuple[InvestmentBase, int]]
+
+
+def remaining(obj: InvestmentBase) -> int:
+    return obj.full_amount - obj.invested_amount
+
+
+def transfer(
+    target: InvestmentBase,
+    source: InvestmentBase,
+    amount: int,
+    transfers: Transfers,
+) -> None:
+    """Перевести сумму из источника в цель и закрыть заполненные."""
+    close_date = datetime.now()
+    for obj in (source, target):
+        obj.invested_amount += amount
+        if obj.invested_amount >= obj.full_amount:
+            obj.fully_invested = True
+            obj.close_date = close_date
+    transfers.append((source, amount))
+
+
+class AllocationStrategy(ABC):
+    """Порядок, в котором цели забирают средства открытого пула."""
+
+    # Пул читается по убыванию ключа `priority`.
+    descending = False
+    # Остается ли пул упорядоченным, когда цель частично забрала
+    # средства последнего источника. Если нет, пул перечитывается
+    # для каждой цели.
+    keeps_order = True
+
+    @staticmethod
+    @abstractmethod
+    def priority(
+        model: Type[InvestmentBase],
+    ) -> Tuple[InstrumentedAttribute, ...]:
+        """Ключ сортировки открытого пула, последний элемент — id."""
+
+
+class FifoStrategy(AllocationStrategy):
+    """Сначала самые старые источники."""
+
+    @staticmethod
+    def priority(model):
+        return (model.id,)
+
+
+class ClosestToGoalStrategy(AllocationStrategy):
+    """Сначала источники, которым осталось меньше всего до закрытия."""
+
+    @staticmethod
+    def priority(model):
+        return (model.remaining_amount, model.id)
+
+
+class LargestRemainingStrategy(AllocationStrategy):
+    """Сначала источники с наибольшим остатком, при равных — новые."""
+
+    descending = True
+    keeps_order = False
+
+    @staticmethod
+    def priority(model):
+        return (model.remaining_amount, model.id)
+
+
+class ProportionalStrategy:
+    """Сумма цели делится между источниками пропорционально остаткам.
+
+    Целые части долей раздаются напрямую, нераспределенные единицы
+    достаются источникам с наибольшими дробными частями: они выбираются
+    из кучи за O(n log k). Общий остаток пула поддерживается инкрементно.
+    """
+
+    def __init__(self, sources: List[InvestmentBase]) -> None:
+        self._sources = sorted(
+            (source for source in sources if remaining(source) > 0),
+            key=lambda source: source.id,
+        )
+        self._total = sum(remaining(source) for source in self._sources)
+
+    def fill(
+        self,
+        target: InvestmentBase,
+        transfers: Transfers,
+    ) -> List[InvestmentBase]:
+        """Инвестировать средства в цель, вернуть измененные источники."""
+        need = min(remaining(target), self._total)
+        if need <= 0:
+            return []
+        sources = self._sources
+        amounts = [remaining(source) for source in sources]
+        shares = [need * amount // self._total for amount in amounts]
+        for index in heapq.nlargest(
+            need - sum(shares),
+            range(len(sources)),
+            key=lambda index: (need * amounts[index] % self._total, -index),
+        ):
+            shares[index] += 1
+        updated = []
+        for source, share in zip(sources, shares):
+            if share:
+                transfer(target, source, share, transfers)
+                updated.append(source)
+        self._total -= need
+        if any(source.fully_invested for source in updated):
+            self._sources = [
+                source for source in sources if remaining(source) > 0
+            ]
+        return updated
+
+
+STRATEGIES: Dict[str, Type[AllocationStrategy]] = {
+    STRATEGY_FIFO: FifoStrategy,
+    'closest_to_goal': ClosestToGoalStrategy,
+    'largest_remaining': LargestRemainingStrategy,
+}
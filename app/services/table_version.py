@@ -0,0 +1,121 @@
+"""Счетчики изменений таблиц фонда.
+
+Счетчики нужны только условным GET-запросам (`conditional_get`) и кэшу
+открытого пула (`open_pool_cache`); если оба выключены, записи
+не обращаются к `tableversion` и не выстраиваются в очередь
+за блокировкой его строк. Иначе каждая транзакция, изменившая
+проекты или пожертвования, увеличивает версию таблицы перед
+фиксацией, в той же транзакции. Изменения через ORM отслеживаются
+по flush, изменения в обход ORM отмечаются `mark_table_changed`.
+Для кэша пула новые версии читаются до фиксации в `TABLE_VERSIONS`.
+Настройки должны совпадать во всех процессах. При старте с условными
+GET все версии увеличиваются (`invalidate_table_versions`): записи,
+сделанные, пока счетчики были выключены, их не меняли, и теги,
+выданные до этого, не должны совпадать.
+"""
+from typing import Dict, Iterable, Type
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import TableVersion
+from app.models.table_version import VERSIONED_TABLES
+from app.models.base import InvestmentBase
+
+CHANGED_TABLES = 'changed_tables'
+BULK_CHANGED_TABLES = 'bulk_changed_tables'
+TABLE_VERSIONS = 'table_versions'
+
+
+def table_versions_enabled() -> bool:
+    return settings.conditional_get or settings.open_pool_cache
+
+
+async def get_table_version(table: str, session: AsyncSession) -> int:
+    """Текущая версия таблицы в БД."""
+    version = (
+        await session.execute(
+            select(TableVersion.version).where(TableVersion.name == table)
+        )
+    ).scalar()
+    return version or 0
+
+
+def mark_table_changed(
+    session: AsyncSession,
+    model: Type[InvestmentBase],
+) -> None:
+    """Отметить таблицу измененной в обход ORM."""
+    for key in (CHANGED_TABLES, BULK_CHANGED_TABLES):
+        session.sync_session.info.setdefault(key, set()).add(
+            model.__tablename__
+        )
+
+
+def bump_table_versions(session: Session, tables: Iterable[str]) -> None:
+    """Увеличить версии таблиц одним UPDATE."""
+    tables = sorted(tables)
+    result = session.execute(
+        update(TableVersion)
+        .where(TableVersion.name.in_(tables))
+        .values(version=TableVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount < len(tables):
+        existing = read_table_versions(session, tables)
+        session.execute(insert(TableVersion), [
+            dict(name=table, version=1)
+            for table in tables if table not in existing
+        ])
+
+
+async def invalidate_table_versions(session: AsyncSession) -> None:
+    """Увеличить версии всех таблиц: выданные ранее теги устаревают."""
+    await session.run_sync(bump_table_versions, VERSIONED_TABLES)
+    await session.commit()
+
+
+def read_table_versions(
+    session: Session,
+    tables: Iterable[str],
+) -> Dict[str, int]:
+    """Версии таблиц в текущей транзакции."""
+    return dict(session.execute(
+        select(TableVersion.name, TableVersion.version)
+        .where(TableVersion.name.in_(list(tables)))
+    ).all())
+
+
+@event.listens_for(Session, 'after_flush')
+def collect_changed_tables(session: Session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, InvestmentBase):
+            session.info.setdefault(CHANGED_TABLES, set()).add(
+                obj.__tablename__
+            )
+
+
+@event.listens_for(Session, 'before_commit')
+def bump_changed_tables(session: Session) -> None:
+    session.flush()
+    tables = session.info.get(CHANGED_TABLES)
+    if not tables or not table_versions_enabled():
+        return
+    bump_table_versions(session, tables)
+    if settings.open_pool_cache:
+        session.info[TABLE_VERSIONS] = read_table_versions(session, tables)
+
+
+@event.listens_for(Session, 'after_commit')
+def discard_changed_tables(session: Session) -> None:
+    session.info.pop(CHANGED_TABLES, None)
+    session.info.pop(BULK_CHANGED_TABLES, None)
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_table_versions(session: Session) -> None:
+    session.info.pop(CHANGED_TABLES, None)
+    session.info.pop(BULK_CHANGED_TABLES, None)
+    session.info.pop(TABLE_VERSIONS, None)
@@ -0,0 +1,92 @@
+"""Генераторы синтетического состояния фонда для бенчмарков.
+
+Состояние согласовано с инвариантом FIFO: открытой может быть только
+одна сторона. Объекты открытой стороны частично инвестированы,
+объекты другой стороны закрыты.
+"""
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.models import CharityProject, Donation, User
+
+OPEN_DONATIONS = 'donations'
+OPEN_PROJECTS = 'projects'
+INSERT_BATCH_SIZE = 10000
+START_DATE = datetime(2020, 1, 1)
+
+
+def fund_rows(count, is_open, rng, **extra):
+    """Строки таблицы фонда: открытые или закрытые объекты."""
+    for index in range(count):
+        full_amount = rng.randint(100, 100000)
+        invested_amount = (
+            rng.randint(0, full_amount - 1) if is_open else full_amount
+        )
+        create_date = START_DATE + timedelta(seconds=index)
+        yield dict(
+            full_amount=full_amount,
+            invested_amount=invested_amount,
+            remaining_amount=full_amount - invested_amount,
+            fully_invested=not is_open,
+            create_date=create_date,
+            close_date=None if is_open else create_date,
+            **{
+                key: value(index) if callable(value) else value
+                for key, value in extra.items()
+            },
+        )
+
+
+async def insert_rows(connection: AsyncConnection, model, rows) -> None:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == INSERT_BATCH_SIZE:
+            await connection.execute(insert(model), batch)
+            batch = []
+    if batch:
+        await connection.execute(insert(model), batch)
+
+
+async def populate_fund(
+    connection: AsyncConnection,
+    donations: int,
+    projects: int,
+    open_side: str,
+    seed: int,
+) -> User:
+    """Заполнить пустую БД и вернуть пользователя-владельца пожертвований.
+    `open_side` — открытая сторона: OPEN_DONATIONS или OPEN_PROJECTS.
+    """
+    rng = random.Random(seed)
+    await connection.execute(insert(User).values(
+        id=1,
+        email='benchmark@example.com',
+        hashed_password='',
+        is_active=True,
+        is_superuser=False,
+        is_verified=True,
+    ))
+    await insert_rows(connection, Donation, fund_rows(
+        donations, open_side == OPEN_DONATIONS, rng,
+        user_id=1, allocated_at=START_DATE,
+    ))
+    await insert_rows(connection, CharityProject, fund_rows(
+        projects, open_side == OPEN_PROJECTS, rng,
+        name=lambda index: f'Project {index}',
+        description='Benchmark project',
+    ))
+    return User(id=1)
+
+
+def make_pool(count: int, seed: int) -> list:
+    """Открытый пул в памяти для замеров `invest()` без БД."""
+    rng = random.Random(seed)
+    return [
+        SimpleNamespace(id=index, **row)
+        for index, row in enumerate(fund_rows(count, True, rng), start=1)
+    ]
@@ -0,0 +1,257 @@
+"""Бенчмарк движка инвестирования и эндпоинтов создания.
+
+Запуск:
+`python -m benchmarks.invest --donations 1000 100000 --projects 100 10000`
+
+Для каждой пары размеров генерируется состояние фонда в SQLite
+и замеряются `invest()`, `create_new_donation` и
+`create_new_charity_project`: задержка вызова, число запросов,
+загруженные и измененные строки, пиковая память. Задержка и память
+меряются в разных проходах, чтобы tracemalloc не искажал время.
+Результат — JSON-документ, пригодный для сравнения между коммитами.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+
+import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.endpoints.charity_project import create_new_charity_project
+from app.api.endpoints.donation import create_new_donation
+from app.core.base import Base
+from app.core.config import settings
+from app.models.base import InvestmentBase
+from app.schemas import CharityProjectCreate, DonationCreate
+from app.services.invest import invest
+from app.services.pool_cache import open_pool_cache
+from benchmarks.fund import (
+    OPEN_DONATIONS, OPEN_PROJECTS, make_pool, populate_fund,
+)
+
+
+@dataclass
+class Result:
+    benchmark: str
+    donations: int
+    projects: int
+    calls: int
+    latency_ms_mean: float
+    latency_ms_p50: float
+    latency_ms_p95: float
+    latency_ms_max: float
+    queries_per_call: float
+    rows_loaded_per_call: float
+    rows_written_per_call: float
+    peak_memory_kb: float
+
+
+class Counters:
+    """Счетчики запросов и строк, снятые событиями SQLAlchemy."""
+
+    def __init__(self, engine) -> None:
+        self.queries = 0
+        self.rows_loaded = 0
+        self.rows_written = 0
+        event.listen(engine.sync_engine, 'after_cursor_execute', self.query)
+        event.listen(InvestmentBase, 'load', self.load, propagate=True)
+
+    def query(self, conn, cursor, statement, parameters, context, many):
+        self.queries += 1
+        if context.isinsert or context.isupdate or context.isdelete:
+            self.rows_written += max(cursor.rowcount, 0)
+
+    def load(self, target, context) -> None:
+        self.rows_loaded += 1
+
+    def close(self) -> None:
+        event.remove(InvestmentBase, 'load', self.load)
+
+
+def make_result(name, donations, projects, latencies, counters, peaks):
+    calls = len(latencies)
+    counted = calls + len(peaks)
+    latencies = sorted(latency * 1000 for latency in latencies)
+    return Result(
+        benchmark=name,
+        donations=donations,
+        projects=projects,
+        calls=calls,
+        latency_ms_mean=statistics.mean(latencies),
+        latency_ms_p50=latencies[calls // 2],
+        latency_ms_p95=latencies[min(calls - 1, int(calls * 0.95))],
+        latency_ms_max=latencies[-1],
+        queries_per_call=counters.queries / counted,
+        rows_loaded_per_call=counters.rows_loaded / counted,
+        rows_written_per_call=counters.rows_written / counted,
+        peak_memory_kb=max(peaks) / 1024,
+    )
+
+
+async def measure(call, calls):
+    """Прогнать `calls` вызовов для задержки и столько же под tracemalloc."""
+    latencies = []
+    for index in range(calls):
+        started = perf_counter()
+        await call(index)
+        latencies.append(perf_counter() - started)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for index in range(calls, 2 * calls):
+            tracemalloc.reset_peak()
+            await call(index)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+    return latencies, peaks
+
+
+async def bench_invest(donations, projects, calls, seed):
+    """`invest()` в памяти: новый проект против открытых пожертвований."""
+    pool = make_pool(donations, seed)
+    rng = random.Random(seed + 1)
+    counters = SimpleNamespace(queries=0, rows_loaded=0, rows_written=0)
+
+    async def call(index):
+        nonlocal pool
+        target = SimpleNamespace(
+            full_amount=rng.randint(1000, 100000), invested_amount=0,
+            fully_invested=False, close_date=None,
+        )
+        counters.rows_written += len(invest(target, pool))
+        closed = 0
+        while closed < len(pool) and pool[closed].fully_invested:
+            closed += 1
+        pool = pool[closed:]
+
+    latencies, peaks = await measure(call, calls)
+    return make_result(
+        'invest', donations, projects, latencies, counters, peaks
+    )
+
+
+async def bench_endpoint(name, open_side, donations, projects, calls, seed):
+    """Эндпоинт создания против фонда из SQLite во временном каталоге."""
+    open_pool_cache.invalidate()
+    rng = random.Random(seed + 1)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(
+            f'sqlite+aiosqlite:///{Path(directory) / "bench.db"}'
+        )
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            user = await populate_fund(
+                connection, donations, projects, open_side, seed
+            )
+        session_factory = sessionmaker(engine, class_=AsyncSession)
+        counters = Counters(engine)
+
+        async def call(index):
+            async with session_factory() as session:
+                if open_side == OPEN_PROJECTS:
+                    await create_new_donation(
+                        DonationCreate(full_amount=rng.randint(100, 10000)),
+                        session,
+                        user,
+                    )
+                else:
+                    await create_new_charity_project(
+                        CharityProjectCreate(
+                            name=f'Benchmark {index}',
+                            description='Benchmark project',
+                            full_amount=rng.randint(1000, 100000),
+                        ),
+                        session,
+                    )
+
+        try:
+            latencies, peaks = await measure(call, calls)
+        finally:
+            counters.close()
+            await engine.dispose()
+    return make_result(name, donations, projects, latencies, counters, peaks)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    results = []
+    for donations, projects in product(args.donations, args.projects):
+        results.append(
+            await bench_invest(donations, projects, args.calls, args.seed)
+        )
+        results.append(await bench_endpoint(
+            'create_new_donation', OPEN_PROJECTS,
+            donations, projects, args.calls, args.seed,
+        ))
+        results.append(await bench_endpoint(
+            'create_new_charity_project', OPEN_DONATIONS,
+            donations, projects, args.calls, args.seed,
+        ))
+        print(
+            f'{donations} donations x {projects} projects: done',
+            file=sys.stderr,
+        )
+    return dict(
+        created_at=datetime.now().isoformat(),
+        git_revision=git_revision(),
+        python=platform.python_version(),
+        sqlalchemy=sqlalchemy.__version__,
+        seed=args.seed,
+        settings=dict(
+            invest_engine=settings.invest_engine,
+            invest_chunk_size=settings.invest_chunk_size,
+            allocation_strategy=settings.allocation_strategy,
+            open_pool_cache=settings.open_pool_cache,
+        ),
+        results=[asdict(result) for result in results],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Бенчмарк движка инвестирования.'
+    )
+    parser.add_argument(
+        '--donations', type=int, nargs='+', default=[1000, 10000]
+    )
+    parser.add_argument('--projects', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--calls', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--output', type=Path, help='файл для JSON (по умолчанию stdout)'
+    )
+    args = parser.parse_args()
+    report = json.dumps(asyncio.run(run(args)), indent=2, ensure_ascii=False)
+    if args.output is None:
+        print(report)
+    else:
+        args.output.write_text(report + '\n', encoding='utf-8')
+
+
+if __name__ == '__main__':
+    main()
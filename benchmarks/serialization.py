@@ -0,0 +1,130 @@
+"""Бенчмарк сериализации списка проектов.
+
+Запуск: `python -m benchmarks.serialization [--rows N ...] [--repeat R]`.
+Сравниваются пути ответа `GET /charity_project/`: ORM-объекты через
+`response_model` (валидация `orm_mode` и `jsonable_encoder`), строки
+Core через `schema.construct()` и строки Core через orjson.
+Для каждого пути выводится стоимость строки отдельно для чтения из БД
+и для сериализации, в микросекундах.
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.utils import create_response_field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.serialization import dump_list
+from app.core.base import Base
+from app.core.config import settings
+from app.models import CharityProject
+from app.schemas import CharityProjectDB
+from benchmarks.fund import OPEN_PROJECTS, populate_fund
+
+FIELDS = tuple(CharityProjectDB.__fields__)
+RESPONSE_FIELD = create_response_field(
+    name='response', type_=list[CharityProjectDB]
+)
+
+
+def serialize_orm(projects) -> bytes:
+    """То же, что делает FastAPI для `response_model`."""
+    value, errors = RESPONSE_FIELD.validate(projects, {}, loc=('response',))
+    return json.dumps(
+        jsonable_encoder(value, exclude_none=True),
+        ensure_ascii=False, allow_nan=False, indent=None,
+        separators=(',', ':'),
+    ).encode()
+
+
+def serialize_rows(rows, fast) -> bytes:
+    settings.fast_serialization = fast
+    return dump_list(rows, CharityProjectDB)
+
+
+async def load_orm(session):
+    result = await session.execute(
+        select(CharityProject).order_by(CharityProject.id)
+    )
+    return result.scalars().all()
+
+
+async def load_rows(session):
+    result = await session.execute(
+        select(*(getattr(CharityProject, name) for name in FIELDS))
+        .order_by(CharityProject.id)
+    )
+    return result.mappings().all()
+
+
+PATHS = (
+    ('orm+response_model', load_orm, serialize_orm),
+    ('rows+construct', load_rows, lambda rows: serialize_rows(rows, False)),
+    ('rows+orjson', load_rows, lambda rows: serialize_rows(rows, True)),
+)
+
+
+async def bench(rows, repeat, seed):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(
+            f'sqlite+aiosqlite:///{Path(directory) / "bench.db"}'
+        )
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await populate_fund(connection, 0, rows, OPEN_PROJECTS, seed)
+        session_factory = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        fast_serialization = settings.fast_serialization
+        try:
+            for name, load, serialize in PATHS:
+                load_time = dump_time = 0.0
+                for _ in range(repeat):
+                    async with session_factory() as session:
+                        started = perf_counter()
+                        objs = await load(session)
+                        loaded = perf_counter()
+                        body = serialize(objs)
+                        load_time += loaded - started
+                        dump_time += perf_counter() - loaded
+                per_row = 1e6 / (rows * repeat)
+                results.append(dict(
+                    path=name,
+                    rows=rows,
+                    load_us_per_row=round(load_time * per_row, 3),
+                    serialize_us_per_row=round(dump_time * per_row, 3),
+                    body_bytes=len(body),
+                ))
+        finally:
+            settings.fast_serialization = fast_serialization
+            await engine.dispose()
+    return results
+
+
+async def run(args):
+    results = []
+    for rows in args.rows:
+        results.extend(await bench(rows, args.repeat, args.seed))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Бенчмарк сериализации списка проектов.'
+    )
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
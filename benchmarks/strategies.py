@@ -0,0 +1,85 @@
+"""Сравнение стратегий распределения на открытом пуле в SQLite.
+
+Запуск: `python -m benchmarks.strategies [--sources N] [--targets M]`.
+Для каждой стратегии фонд с N открытыми проектами создается заново,
+затем M пожертвований распределяются по одному через
+`run_batch_investment`. Печатаются время и число загруженных строк
+пула на одну цель: жадные стратегии читают пул постранично
+по индексу, пропорциональная — целиком.
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.core.config import settings
+from app.crud import charity_project_crud
+from app.models import CharityProject, Donation
+from app.services.invest import run_batch_investment
+from app.services.strategies import STRATEGIES, STRATEGY_PROPORTIONAL
+from benchmarks.fund import OPEN_PROJECTS, populate_fund
+
+
+async def measure(strategy, args):
+    settings.allocation_strategy = strategy
+    rng = random.Random(args.seed + 1)
+    loaded = 0
+
+    def count_load(target, context):
+        nonlocal loaded
+        loaded += 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(
+            f'sqlite+aiosqlite:///{Path(directory) / "bench.db"}'
+        )
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await populate_fund(
+                connection, 0, args.sources, OPEN_PROJECTS, args.seed
+            )
+        session_factory = sessionmaker(engine, class_=AsyncSession)
+        event.listen(CharityProject, 'load', count_load)
+        started = perf_counter()
+        try:
+            for _ in range(args.targets):
+                async with session_factory() as session:
+                    donation = Donation(
+                        full_amount=rng.randint(100, 5000), user_id=1
+                    )
+                    session.add(donation)
+                    await run_batch_investment(
+                        [donation], charity_project_crud, session
+                    )
+                    await session.commit()
+            elapsed = perf_counter() - started
+        finally:
+            event.remove(CharityProject, 'load', count_load)
+            await engine.dispose()
+    return elapsed, loaded / args.targets
+
+
+async def run(args):
+    print(f'{"strategy":<20}{"seconds":>10}{"rows/target":>14}')
+    for strategy in (*STRATEGIES, STRATEGY_PROPORTIONAL):
+        elapsed, rows = await measure(strategy, args)
+        print(f'{strategy:<20}{elapsed:>10.4f}{rows:>14.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sources', type=int, default=20000)
+    parser.add_argument('--targets', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+import pytest
+
+from app.core.config import settings
+
+DONATION_URL = '/donation/'
+PROJECTS_URL = '/charity_project/'
+DONATION_ALLOCATIONS_URL = DONATION_URL + '{donation_id}/allocations'
+PROJECT_ALLOCATIONS_URL = PROJECTS_URL + '{project_id}/allocations'
+
+
+@pytest.mark.parametrize('engine', ['python', 'sql'])
+def test_donation_allocations(
+        engine, monkeypatch, user_client,
+        charity_project_little_invested, charity_project_nunchaku
+):
+    monkeypatch.setattr(settings, 'invest_engine', engine)
+    donation_id = user_client.post(
+        DONATION_URL, json={'full_amount': 1000000}
+    ).json()['id']
+    response = user_client.get(
+        DONATION_ALLOCATIONS_URL.format(donation_id=donation_id)
+    )
+    assert response.status_code == 200, (
+        'GET-запрос владельца пожертвования к эндпоинту '
+        f'`{DONATION_ALLOCATIONS_URL}` должен вернуть статус-код 200.'
+    )
+    assert [
+        (item['charity_project_id'], item['amount'])
+        for item in response.json()
+    ] == [
+        (charity_project_little_invested.id, 999900),
+        (charity_project_nunchaku.id, 100),
+    ], (
+        f'Движок инвестирования `{engine}` должен записывать в журнал '
+        'каждый перевод средств пожертвования в проект.'
+    )
+
+
+def test_other_user_donation_allocations(user_client, another_donation):
+    response = user_client.get(
+        DONATION_ALLOCATIONS_URL.format(donation_id=another_donation.id)
+    )
+    assert response.status_code == 404, (
+        'Журнал распределения чужого пожертвования должен быть недоступен.'
+    )
+
+
+@pytest.mark.parametrize('engine', ['python', 'sql'])
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_project_allocations_pagination(engine, monkeypatch, superuser_client):
+    monkeypatch.setattr(settings, 'invest_engine', engine)
+    project_id = superuser_client.post(PROJECTS_URL, json={
+        'name': 'Cats', 'description': 'Food for cats', 'full_amount': 1500,
+    }).json()['id']
+    url = PROJECT_ALLOCATIONS_URL.format(project_id=project_id)
+    response = superuser_client.get(url, params={'limit': 1})
+    assert [item['amount'] for item in response.json()] == [100], (
+        'Первая страница журнала проекта должна содержать первый перевод.'
+    )
+    next_cursor = response.headers.get('X-Next-Cursor')
+    assert next_cursor, (
+        'Если в журнале есть следующая страница, ответ должен содержать '
+        'заголовок `X-Next-Cursor`.'
+    )
+    response = superuser_client.get(
+        url, params={'limit': 1, 'after': next_cursor}
+    )
+    assert [item['amount'] for item in response.json()] == [1400], (
+        'Страница после курсора должна содержать следующий перевод.'
+    )
+    assert 'X-Next-Cursor' not in response.headers, (
+        'На последней странице журнала заголовок `X-Next-Cursor` '
+        'не передается.'
+    )
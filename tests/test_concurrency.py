@@ -0,0 +1,239 @@
+import asyncio
+import os
+
+import pytest
+from conftest import TestingSessionLocal
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.db import Base
+from app.crud import charity_project_crud, donation_crud
+from app.models import Allocation, CharityProject, Donation
+from app.schemas import DonationCreate
+from app.services.invest import run_investment
+from app.services.pool_cache import open_pool_cache
+
+POSTGRES_URL = os.getenv('TEST_POSTGRES_URL')
+PROJECTS_COUNT = 5
+PROJECT_AMOUNT = 1000
+DONATIONS_COUNT = 40
+DONATION_AMOUNT = 150
+
+LOCKED_CHUNK_SIZE = 2
+
+
+async def record_statements(monkeypatch, session):
+    """Перехватывать запросы сессии для компиляции под PostgreSQL."""
+    statements = []
+    execute = session.execute
+
+    async def recording_execute(statement, *args, **kwargs):
+        statements.append(statement)
+        return await execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(session, 'execute', recording_execute)
+    return statements
+
+
+def compile_for_postgres(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+async def create_projects(session):
+    session.add_all([
+        CharityProject(
+            name=f'Project {number}',
+            description='Locking test',
+            full_amount=PROJECT_AMOUNT,
+        )
+        for number in range(PROJECTS_COUNT)
+    ])
+    await session.commit()
+
+
+async def donate(session_factory, amount):
+    """Создать пожертвование и распределить его в отдельной транзакции."""
+    async with session_factory() as session:
+        donation = await donation_crud.create(
+            DonationCreate(full_amount=amount),
+            session,
+            commit=False,
+        )
+        await session.flush()
+        await run_investment(donation, charity_project_crud, session)
+        await session.commit()
+
+
+async def read_totals(session_factory):
+    """Проекты, суммы переводов по проектам и сумма вложенных пожертвований."""
+    async with session_factory() as session:
+        projects = (
+            await session.execute(select(CharityProject))
+        ).scalars().all()
+        allocated = dict((
+            await session.execute(
+                select(
+                    Allocation.charity_project_id,
+                    func.sum(Allocation.amount),
+                ).group_by(Allocation.charity_project_id)
+            )
+        ).all())
+        donations_invested = (
+            await session.execute(select(func.sum(Donation.invested_amount)))
+        ).scalar()
+    return projects, allocated, donations_invested
+
+
+async def test_iter_active_objs_skips_locked_rows(monkeypatch):
+    async with TestingSessionLocal() as session:
+        await create_projects(session)
+        statements = await record_statements(monkeypatch, session)
+        pages = [
+            [project.id for project in page]
+            async for page in charity_project_crud.iter_active_objs(
+                session, LOCKED_CHUNK_SIZE
+            )
+        ]
+    assert pages == [[1, 2], [3, 4], [5]], (
+        'Открытый пул должен читаться страницами по `chunk_size` строк.'
+    )
+    assert all(
+        compile_for_postgres(statement).endswith('FOR UPDATE SKIP LOCKED')
+        for statement in statements
+    ), (
+        'В PostgreSQL страницы открытого пула должны блокироваться '
+        'с пропуском строк, заблокированных другими транзакциями.'
+    )
+
+
+async def test_lock_active_ids_stops_when_amount_covered(monkeypatch):
+    async with TestingSessionLocal() as session:
+        await create_projects(session)
+        statements = await record_statements(monkeypatch, session)
+        locked_ids = await charity_project_crud.lock_active_ids(
+            PROJECT_AMOUNT * 2 + 1, session, LOCKED_CHUNK_SIZE
+        )
+    assert locked_ids == [1, 2, 3, 4], (
+        'Блокировка должна идти порциями в порядке id, пока остатка '
+        'заблокированных строк не хватит на сумму.'
+    )
+    assert len(statements) == 2, (
+        'Когда остатка заблокированных строк хватает на сумму, '
+        'следующие порции не должны запрашиваться.'
+    )
+    assert all(
+        compile_for_postgres(statement).endswith('FOR UPDATE SKIP LOCKED')
+        for statement in statements
+    ), (
+        'В PostgreSQL открытые строки должны блокироваться с пропуском '
+        'строк, заблокированных другими транзакциями.'
+    )
+
+
+async def test_pool_cache_skips_locked_rows(monkeypatch):
+    monkeypatch.setattr(settings, 'open_pool_cache', True)
+    open_pool_cache.invalidate()
+    try:
+        async with TestingSessionLocal() as session:
+            await create_projects(session)
+            statements = await record_statements(monkeypatch, session)
+            sources = await open_pool_cache.get_sources(
+                CharityProject, PROJECT_AMOUNT + 1, session
+            )
+    finally:
+        open_pool_cache.invalidate()
+    assert [source.id for source in sources] == [1, 2], (
+        'Кэш пула должен загружать только строки, покрывающие сумму.'
+    )
+    assert compile_for_postgres(statements[-1]).endswith(
+        'FOR UPDATE SKIP LOCKED'
+    ), (
+        'Строки, выбранные по кэшу пула, должны блокироваться '
+        'с пропуском заблокированных, как и страницы открытого пула.'
+    )
+
+
+@pytest.mark.parametrize('invest_engine', ['python', 'sql'])
+async def test_concurrent_donations_share_last_capacity(
+        invest_engine, monkeypatch
+):
+    monkeypatch.setattr(settings, 'invest_engine', invest_engine)
+    async with TestingSessionLocal() as session:
+        session.add(CharityProject(
+            name='Last capacity',
+            description='Locking test',
+            full_amount=PROJECT_AMOUNT,
+        ))
+        await session.commit()
+    await donate(TestingSessionLocal, PROJECT_AMOUNT - DONATION_AMOUNT)
+    await asyncio.gather(
+        donate(TestingSessionLocal, DONATION_AMOUNT),
+        donate(TestingSessionLocal, DONATION_AMOUNT),
+    )
+    (project,), allocated, donations_invested = await read_totals(
+        TestingSessionLocal
+    )
+    assert project.invested_amount <= project.full_amount, (
+        'Два пожертвования в остаток проекта не должны его переполнять.'
+    )
+    assert project.invested_amount == allocated[project.id] == (
+        donations_invested
+    ), (
+        'Сумма в проекте должна совпадать с журналом переводов '
+        'и с суммой, списанной с пожертвований.'
+    )
+
+
+@pytest.mark.skipif(
+    not POSTGRES_URL,
+    reason='Для стресс-теста нужна PostgreSQL: задайте TEST_POSTGRES_URL.',
+)
+@pytest.mark.parametrize('invest_engine', ['python', 'sql'])
+async def test_concurrent_donations_do_not_overallocate(
+        invest_engine, monkeypatch
+):
+    monkeypatch.setattr(settings, 'invest_engine', invest_engine)
+    monkeypatch.setattr(settings, 'invest_chunk_size', 2)
+    engine = create_async_engine(POSTGRES_URL, pool_size=DONATIONS_COUNT)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession)
+    async with session_factory() as session:
+        session.add_all([
+            CharityProject(
+                name=f'Project {number}',
+                description='Stress test',
+                full_amount=PROJECT_AMOUNT,
+            )
+            for number in range(PROJECTS_COUNT)
+        ])
+        await session.commit()
+
+    try:
+        await asyncio.gather(*(
+            donate(session_factory, DONATION_AMOUNT)
+            for _ in range(DONATIONS_COUNT)
+        ))
+        projects, allocated, donations_invested = await read_totals(
+            session_factory
+        )
+    finally:
+        await engine.dispose()
+    assert all(
+        project.invested_amount <= project.full_amount
+        for project in projects
+    ), 'Параллельные пожертвования не должны переполнять проекты.'
+    assert all(
+        project.invested_amount == allocated.get(project.id, 0)
+        for project in projects
+    ), 'Сумма в проекте должна совпадать с журналом переводов.'
+    assert sum(
+        project.invested_amount for project in projects
+    ) == donations_invested, (
+        'Проекты должны получить ровно столько, сколько списано '
+        'с пожертвований.'
+    )
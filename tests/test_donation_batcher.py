@@ -0,0 +1,173 @@
+import asyncio
+import logging
+
+import pytest
+from conftest import TestingSessionLocal, engine
+from fastapi import HTTPException
+from fixtures.user import user
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.schemas import DonationCreate
+from app.crud import charity_project_crud, donation_crud
+from app.services import donation_batcher as donation_batcher_module
+from app.services.donation_batcher import DonationBatcher
+from app.services.invest_worker import InvestmentWorker
+
+
+async def test_donations_are_written_in_one_transaction(monkeypatch, mixer):
+    project = mixer.blend(
+        'app.models.charity_project.CharityProject',
+        name='Cats',
+        description='Food for cats',
+        full_amount=1000,
+    )
+    monkeypatch.setattr(settings, 'donation_batch_window', 5)
+    monkeypatch.setattr(settings, 'donation_batch_max_size', 3)
+    commits = []
+
+    def count_commit(connection):
+        commits.append(connection)
+
+    event.listen(engine.sync_engine, 'commit', count_commit)
+    batcher = DonationBatcher(TestingSessionLocal)
+    try:
+        results = await asyncio.gather(*(
+            batcher.submit(DonationCreate(full_amount=full_amount), user)
+            for full_amount in (100, 200, 300)
+        ))
+    finally:
+        event.remove(engine.sync_engine, 'commit', count_commit)
+    assert [
+        (result.id, result.full_amount) for result in results
+    ] == [(1, 100), (2, 200), (3, 300)], (
+        'Каждый запрос пакета должен получить данные своего пожертвования.'
+    )
+    assert len(commits) == 1, (
+        'Пакет пожертвований должен записываться одной транзакцией.'
+    )
+    assert project.invested_amount == 600, (
+        'Пожертвования пакета должны быть распределены по открытым проектам.'
+    )
+
+
+async def test_cancelled_leader_does_not_block_batch(monkeypatch, mixer):
+    monkeypatch.setattr(settings, 'donation_batch_window', 0.1)
+    batcher = DonationBatcher(TestingSessionLocal)
+    leader = asyncio.create_task(
+        batcher.submit(DonationCreate(full_amount=100), user)
+    )
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(
+        batcher.submit(DonationCreate(full_amount=200), user)
+    )
+    await asyncio.sleep(0)
+    leader.cancel()
+    result = await asyncio.wait_for(follower, 5)
+    assert result.full_amount == 200, (
+        'Отмена запроса, открывшего пакет, не должна мешать записи '
+        'остальных пожертвований пакета.'
+    )
+
+
+async def test_failed_batch_resolves_every_request(monkeypatch):
+    monkeypatch.setattr(settings, 'donation_batch_window', 0.1)
+
+    def broken_session_factory():
+        raise RuntimeError('database is unavailable')
+
+    batcher = DonationBatcher(broken_session_factory)
+    results = await asyncio.wait_for(asyncio.gather(
+        *(
+            batcher.submit(DonationCreate(full_amount=amount), user)
+            for amount in (100, 200)
+        ),
+        return_exceptions=True,
+    ), 5)
+    assert all(isinstance(result, HTTPException) for result in results), (
+        'Если пакет не удалось записать, каждый запрос пакета '
+        'должен завершиться ошибкой, а не ждать бесконечно.'
+    )
+
+
+async def test_failed_write_logs_error_and_returns_503(monkeypatch, caplog):
+    monkeypatch.setattr(settings, 'donation_batch_window', 0.1)
+
+    async def broken_create(*args, **kwargs):
+        raise RuntimeError('database is locked')
+
+    monkeypatch.setattr(donation_crud, 'create', broken_create)
+    batcher = DonationBatcher(TestingSessionLocal)
+    with caplog.at_level(logging.ERROR):
+        results = await asyncio.wait_for(asyncio.gather(
+            *(
+                batcher.submit(DonationCreate(full_amount=amount), user)
+                for amount in (100, 200)
+            ),
+            return_exceptions=True,
+        ), 5)
+    assert all(
+        isinstance(result, HTTPException) and result.status_code == 503
+        for result in results
+    ), (
+        'Ошибка записи пакета должна возвращаться каждому запросу '
+        'как ошибка 503, а не как исключение БД.'
+    )
+    assert len([
+        record for record in caplog.records if record.exc_info
+    ]) == 1, 'Ошибка записи пакета должна логироваться один раз.'
+
+
+async def read_allocation(donation_ids, project_id):
+    async with TestingSessionLocal() as session:
+        donations = [
+            await donation_crud.get(donation_id, session)
+            for donation_id in donation_ids
+        ]
+        project = await charity_project_crud.get(project_id, session)
+    return [donation.allocated_at for donation in donations], project
+
+
+async def test_deferred_batch_is_allocated_by_worker(monkeypatch, mixer):
+    project = mixer.blend(
+        'app.models.charity_project.CharityProject',
+        name='Cats',
+        description='Food for cats',
+        full_amount=1000,
+    )
+    monkeypatch.setattr(settings, 'donation_batch_window', 0.1)
+    monkeypatch.setattr(settings, 'invest_mode', 'deferred')
+    worker = InvestmentWorker(TestingSessionLocal)
+    monkeypatch.setattr(
+        donation_batcher_module, 'investment_worker', worker
+    )
+    await worker.start()
+    try:
+        batcher = DonationBatcher(TestingSessionLocal)
+        donation_ids = [
+            result.id for result in await asyncio.gather(*(
+                batcher.submit(DonationCreate(full_amount=amount), user)
+                for amount in (100, 200)
+            ))
+        ]
+        allocated, written_project = await read_allocation(
+            donation_ids, project.id
+        )
+        assert not any(allocated) and not written_project.invested_amount, (
+            'В отложенном режиме пакет не должен распределяться '
+            'при записи.'
+        )
+        await worker.join()
+    finally:
+        await worker.stop()
+    allocated, written_project = await read_allocation(
+        donation_ids, project.id
+    )
+    assert all(allocated), (
+        'Пожертвования пакета в отложенном режиме должны '
+        'распределяться фоновым воркером.'
+    )
+    assert written_project.invested_amount == 300, (
+        'Фоновый воркер должен вложить пожертвования пакета '
+        'в открытый проект.'
+    )
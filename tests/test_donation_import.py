@@ -0,0 +1,164 @@
+import os
+from datetime import datetime
+
+import pytest
+from conftest import TEST_DB, TestingSessionLocal, engine
+from fixtures.user import user
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import app.crud.donation as donation_crud_module
+from app.core.config import settings
+from app.core.db import Base
+from app.crud import donation_crud
+from app.models import Donation, User
+from app.schemas import DonationCreate
+
+POSTGRES_URL = os.getenv('TEST_POSTGRES_URL')
+
+BULK_URL = '/donation/bulk'
+MY_DONATIONS_URL = '/donation/my'
+PROJECTS_URL = '/charity_project/'
+NDJSON_HEADERS = {'Content-Type': 'application/x-ndjson'}
+
+
+def test_import_donations(user_client, charity_project):
+    body = '\n'.join((
+        '{"full_amount": 600000}',
+        '{"full_amount": -1}',
+        '',
+        'not json',
+        '{"full_amount": 500000, "comment": "settlement"}',
+    ))
+    response = user_client.post(BULK_URL, data=body, headers=NDJSON_HEADERS)
+    assert response.status_code == 200, (
+        f'POST-запрос к эндпоинту `{BULK_URL}` должен вернуть статус 200.'
+    )
+    results = response.json()
+    assert [result['line'] for result in results] == [1, 2, 4, 5], (
+        'Импорт должен вернуть результат для каждой непустой строки.'
+    )
+    assert 'id' in results[0] and 'id' in results[3], (
+        'Для корректных строк импорт должен вернуть id пожертвования.'
+    )
+    assert 'error' in results[1] and 'error' in results[2], (
+        'Для некорректных строк импорт должен вернуть текст ошибки.'
+    )
+    donations = user_client.get(MY_DONATIONS_URL).json()
+    assert [donation['id'] for donation in donations] == [
+        results[0]['id'], results[3]['id']
+    ], (
+        'Импортированные пожертвования должны принадлежать пользователю '
+        'в порядке строк файла.'
+    )
+    project = user_client.get(PROJECTS_URL).json()[0]
+    assert project['fully_invested'], (
+        'Импортированные пожертвования должны распределяться '
+        'по открытым проектам.'
+    )
+    assert charity_project.fully_invested, (
+        'Импортированные пожертвования должны распределяться '
+        'по открытым проектам.'
+    )
+
+
+def test_import_donations_size_limit(monkeypatch, user_client):
+    monkeypatch.setattr(settings, 'donation_import_max_size', 1)
+    response = user_client.post(
+        BULK_URL,
+        data='{"full_amount": 100}\n{"full_amount": 100}\n',
+        headers=NDJSON_HEADERS,
+    )
+    assert response.status_code == 413, (
+        'Импорт сверх допустимого числа строк должен вернуть статус 413.'
+    )
+    assert user_client.get(MY_DONATIONS_URL).json() == [], (
+        'Отклоненный импорт не должен создавать пожертвования.'
+    )
+
+
+async def test_create_multi_returns_only_own_rows(freezer):
+    foreign_engine = create_engine(f'sqlite:///{TEST_DB}')
+    inserts = []
+
+    def insert_foreign_row(conn, cursor, statement, parameters, context,
+                           executemany):
+        if not statement.startswith('INSERT INTO donation'):
+            return
+        inserts.append(executemany)
+        if len(inserts) > 1:
+            return
+        with foreign_engine.begin() as connection:
+            connection.execute(insert(Donation).values(
+                full_amount=1, invested_amount=0, remaining_amount=1,
+                fully_invested=False, user_id=user.id,
+                create_date=datetime.now(),
+            ))
+
+    event.listen(
+        engine.sync_engine, 'before_cursor_execute', insert_foreign_row
+    )
+    amounts = [10, 20, 30, 40]
+    try:
+        async with TestingSessionLocal() as session:
+            donation_ids = await donation_crud.create_multi(
+                [DonationCreate(full_amount=amount) for amount in amounts],
+                user,
+                session,
+            )
+            await session.commit()
+            written = dict((await session.execute(
+                select(Donation.id, Donation.full_amount)
+            )).all())
+    finally:
+        event.remove(
+            engine.sync_engine, 'before_cursor_execute', insert_foreign_row
+        )
+        foreign_engine.dispose()
+    assert donation_ids == [2, 3, 4, 5], (
+        'Пакетная запись должна возвращать id только своих строк, даже '
+        'если параллельно тот же пользователь создал пожертвование '
+        'с той же датой.'
+    )
+    assert [written[donation_id] for donation_id in donation_ids] == amounts, (
+        'Id должны возвращаться в порядке строк пакета.'
+    )
+    assert inserts == [False, True], (
+        'Пакет должен записываться одним executemany после вставки '
+        'первой строки.'
+    )
+
+
+@pytest.mark.skipif(
+    not POSTGRES_URL,
+    reason='Для проверки RETURNING нужна PostgreSQL: задайте '
+           'TEST_POSTGRES_URL.',
+)
+async def test_create_multi_returning_keeps_row_order(monkeypatch):
+    monkeypatch.setattr(donation_crud_module, 'INSERT_CHUNK_SIZE', 3)
+    pg_engine = create_async_engine(POSTGRES_URL)
+    async with pg_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    amounts = [50, 10, 40, 20, 30, 60, 70]
+    try:
+        async with AsyncSession(pg_engine) as session:
+            session.add(User(
+                id=user.id, email='user@example.com', hashed_password='',
+            ))
+            await session.flush()
+            donation_ids = await donation_crud.create_multi(
+                [DonationCreate(full_amount=amount) for amount in amounts],
+                user,
+                session,
+            )
+            await session.commit()
+            written = dict((await session.execute(
+                select(Donation.id, Donation.full_amount)
+            )).all())
+    finally:
+        await pg_engine.dispose()
+    assert [written[donation_id] for donation_id in donation_ids] == amounts, (
+        'Id из INSERT ... RETURNING должны возвращаться в порядке строк '
+        'пакета, в том числе при записи порциями.'
+    )
@@ -0,0 +1,124 @@
+import pytest
+from conftest import TestingSessionLocal, engine
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import app.main
+from app.core.config import settings
+
+DONATION_URL = '/donation/'
+MY_DONATIONS_URL = '/donation/my'
+PROJECTS_URL = '/charity_project/'
+PROJECT_URL = '/charity_project/1'
+
+
+@pytest.fixture(autouse=True)
+def enable_conditional_get(monkeypatch):
+    monkeypatch.setattr(settings, 'conditional_get', True)
+    monkeypatch.setattr(app.main, 'AsyncSessionLocal', TestingSessionLocal)
+
+
+def get_with_etag(client, url, etag, params=None):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(
+            url, params=params, headers={'If-None-Match': etag}
+        )
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+    return response, statements
+
+
+@pytest.mark.usefixtures('charity_project')
+@pytest.mark.parametrize('url, params', [
+    (PROJECTS_URL, None),
+    (PROJECTS_URL, {'fields': 'id', 'stream': 'ndjson'}),
+    (PROJECT_URL, None),
+])
+def test_not_modified(url, params, user_client):
+    etag = user_client.get(url, params=params).headers.get('ETag')
+    assert etag, f'Ответ `{url}` должен содержать заголовок `ETag`.'
+    response, statements = get_with_etag(user_client, url, etag, params)
+    assert response.status_code == 304, (
+        'Запрос с актуальным `If-None-Match` должен вернуть статус 304.'
+    )
+    assert response.content == b'' and response.headers['ETag'] == etag, (
+        'Ответ 304 должен содержать только заголовок `ETag`.'
+    )
+    assert len(statements) == 1 and 'tableversion' in statements[0], (
+        'Ответ 304 должен определяться одним запросом к счетчику '
+        f'изменений без чтения строк. Выполнено: {statements}'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_etag_changes_after_investment(user_client):
+    etag = user_client.get(PROJECTS_URL).headers['ETag']
+    my_etag = user_client.get(MY_DONATIONS_URL).headers['ETag']
+    user_client.post(DONATION_URL, json={'full_amount': 100})
+    response, _ = get_with_etag(user_client, PROJECTS_URL, etag)
+    assert response.status_code == 200, (
+        'После распределения пожертвования список проектов '
+        'должен отдаваться заново.'
+    )
+    assert response.json()[0]['invested_amount'] == 100, (
+        'После распределения пожертвования список проектов '
+        'должен отдаваться заново.'
+    )
+    response, _ = get_with_etag(user_client, MY_DONATIONS_URL, my_etag)
+    assert response.status_code == 200, (
+        'После создания пожертвования список своих пожертвований '
+        'должен отдаваться заново.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_etag_changes_after_update(superuser_client):
+    etag = superuser_client.get(PROJECT_URL).headers['ETag']
+    superuser_client.patch(PROJECT_URL, json={'name': 'Renamed project'})
+    response, _ = get_with_etag(superuser_client, PROJECT_URL, etag)
+    assert response.status_code == 200, (
+        'После изменения проекта он должен отдаваться заново.'
+    )
+    assert response.headers['ETag'] != etag, (
+        'После изменения проекта `ETag` должен измениться.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_etag_changes_after_restart(user_client):
+    etag = user_client.get(PROJECTS_URL).headers['ETag']
+    with TestClient(app.main.app) as restarted_client:
+        response, _ = get_with_etag(restarted_client, PROJECTS_URL, etag)
+    assert response.status_code == 200, (
+        'Теги, выданные до запуска приложения, не должны совпадать: '
+        'записи без счетчиков изменений их не меняли.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_versions_not_bumped_without_consumers(monkeypatch, user_client):
+    monkeypatch.setattr(settings, 'conditional_get', False)
+    monkeypatch.setattr(settings, 'open_pool_cache', False)
+    assert 'ETag' not in user_client.get(PROJECTS_URL).headers, (
+        'Без `conditional_get` ответ не должен содержать `ETag`.'
+    )
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+    try:
+        user_client.post(DONATION_URL, json={'full_amount': 100})
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+    assert not any('tableversion' in sql for sql in statements), (
+        'Если счетчики изменений никому не нужны, запись не должна '
+        'обновлять общую строку `tableversion`.'
+    )
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+from conftest import engine
+from sqlalchemy import event
+
+DONATION_URL = '/donation/'
+MY_DONATIONS_URL = '/donation/my'
+PROJECTS_URL = '/charity_project/'
+PROJECT_URL = '/charity_project/{project_id}'
+PROGRESS_FIELDS = 'id,invested_amount,fully_invested'
+
+
+def capture_statements(client, url, params):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(url, params=params)
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+    return response, statements
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_charity_projects_fields(user_client):
+    response, statements = capture_statements(
+        user_client, PROJECTS_URL, {'fields': PROGRESS_FIELDS, 'limit': 1}
+    )
+    assert response.status_code == 200, (
+        f'GET-запрос к `{PROJECTS_URL}` с параметром `fields` '
+        'должен вернуть статус 200.'
+    )
+    assert response.json() == [
+        {'id': 1, 'invested_amount': 0, 'fully_invested': False},
+    ], (
+        'Ответ с параметром `fields` должен содержать только '
+        'перечисленные поля.'
+    )
+    assert response.headers.get('X-Next-Cursor') == '1', (
+        'Параметр `fields` не должен отключать пагинацию.'
+    )
+    assert not any('description' in sql for sql in statements), (
+        'Поля, не указанные в `fields`, не должны читаться из БД.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_charity_project_detail(user_client):
+    full = user_client.get(PROJECT_URL.format(project_id=1))
+    assert full.status_code == 200, (
+        f'GET-запрос к `{PROJECT_URL}` должен вернуть статус 200.'
+    )
+    assert full.json() == user_client.get(PROJECTS_URL).json()[0], (
+        'Проект без `fields` должен выводиться полностью.'
+    )
+    sparse = user_client.get(
+        PROJECT_URL.format(project_id=1), params={'fields': 'name'}
+    )
+    assert sparse.json() == {'name': 'chimichangas4life'}, (
+        'Проект с `fields` должен содержать только перечисленные поля.'
+    )
+    missing = user_client.get(
+        PROJECT_URL.format(project_id=2), params={'fields': 'name'}
+    )
+    assert missing.status_code == 404, (
+        'Запрос несуществующего проекта должен вернуть статус 404.'
+    )
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_user_donations_fields(user_client):
+    response = user_client.get(
+        MY_DONATIONS_URL,
+        params={'fields': 'full_amount', 'with_total': True},
+    )
+    assert response.json() == [{'full_amount': 100}], (
+        'Ответ с параметром `fields` должен содержать только '
+        'перечисленные поля.'
+    )
+    assert response.headers.get('X-Total-Amount') == '100', (
+        'Параметр `fields` не должен отключать `with_total`.'
+    )
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_all_donations_stream_fields(superuser_client):
+    response = superuser_client.get(
+        DONATION_URL, params={'fields': 'id,user_id', 'stream': 'ndjson'}
+    )
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {'id': 1, 'user_id': 2},
+        {'id': 2, 'user_id': 1},
+    ], (
+        'Потоковая выдача должна учитывать параметр `fields`.'
+    )
+
+
+@pytest.mark.parametrize('fields', ['', 'id,password', ' , '])
+def test_fields_validation(fields, user_client):
+    response = user_client.get(PROJECTS_URL, params={'fields': fields})
+    assert response.status_code == 422, (
+        'Пустой список или неизвестные поля в `fields` должны '
+        'отклоняться со статусом 422.'
+    )
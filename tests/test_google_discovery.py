@@ -0,0 +1,86 @@
+import pytest
+from aiogoogle.resource import GoogleAPI
+
+from app.core.config import settings
+from app.services.google_client import spreadsheets_create
+from app.services.google_discovery import discovery_cache, get_discovery_apis
+
+SHEETS_DOCUMENT = {
+    'name': 'sheets',
+    'version': 'v4',
+    'rootUrl': 'https://sheets.googleapis.com/',
+    'servicePath': '',
+    'batchPath': 'batch',
+    'resources': {
+        'spreadsheets': {
+            'methods': {
+                'create': {
+                    'httpMethod': 'POST',
+                    'path': 'v4/spreadsheets',
+                    'parameters': {},
+                },
+            },
+        },
+    },
+}
+
+
+class FakeWrapperService:
+    def __init__(self):
+        self.discovered = []
+
+    async def discover(self, api_name, api_version):
+        self.discovered.append((api_name, api_version))
+        return GoogleAPI(dict(SHEETS_DOCUMENT, name=api_name))
+
+    async def as_service_account(self, request):
+        return {'spreadsheetId': 'sheet', 'spreadsheetUrl': request.url}
+
+
+@pytest.fixture(autouse=True)
+def discovery_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, 'google_discovery_cache_dir', str(tmp_path))
+    discovery_cache.reset()
+    yield tmp_path
+    discovery_cache.reset()
+
+
+async def test_discovery_document_downloaded_once():
+    wrapper_service = FakeWrapperService()
+    for _ in range(3):
+        _, url = await spreadsheets_create(wrapper_service)
+    assert url == 'https://sheets.googleapis.com/v4/spreadsheets', (
+        'Описание API из кеша должно строить те же запросы, что и скачанное.'
+    )
+    assert wrapper_service.discovered == [
+        ('sheets', settings.google_sheets_api_version)
+    ], (
+        'Discovery-документ должен скачиваться один раз, '
+        'а не при каждом формировании отчета.'
+    )
+    assert discovery_cache.path(
+        'sheets', settings.google_sheets_api_version
+    ).exists(), 'Скачанный discovery-документ должен сохраняться на диск.'
+
+
+async def test_discovery_document_loaded_from_disk():
+    await discovery_cache.refresh(FakeWrapperService())
+    discovery_cache.reset()
+    assert discovery_cache.load() == len(get_discovery_apis()), (
+        'При старте приложения discovery-документы читаются с диска.'
+    )
+    wrapper_service = FakeWrapperService()
+    await spreadsheets_create(wrapper_service)
+    assert wrapper_service.discovered == [], (
+        'При наличии кеша на диске discovery-документ не должен '
+        'скачиваться из сети.'
+    )
+
+
+async def test_discovery_document_refresh():
+    wrapper_service = FakeWrapperService()
+    await spreadsheets_create(wrapper_service)
+    await discovery_cache.refresh(wrapper_service)
+    assert wrapper_service.discovered[1:] == list(get_discovery_apis()), (
+        'Обновление кеша должно заново скачать все discovery-документы.'
+    )
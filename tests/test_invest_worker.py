@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from conftest import TestingSessionLocal
+from pydantic import ValidationError
+
+from app.core.config import Settings, settings
+from app.services.invest_worker import InvestmentWorker
+
+DONATION_URL = '/donation/'
+DONATION_STATUS_URL = DONATION_URL + '{donation_id}/status'
+
+
+async def test_deferred_donation_is_allocated_by_worker(
+        monkeypatch, user_client, charity_project
+):
+    monkeypatch.setattr(settings, 'invest_mode', 'deferred')
+    response = user_client.post(DONATION_URL, json={'full_amount': 100})
+    assert response.status_code == 200, (
+        'В отложенном режиме пожертвование должно сохраняться сразу.'
+    )
+    status_url = DONATION_STATUS_URL.format(donation_id=response.json()['id'])
+    status = user_client.get(status_url).json()
+    assert status['allocated_at'] is None and not status['invested_amount'], (
+        'До работы фонового воркера пожертвование должно ожидать '
+        'распределения.'
+    )
+    worker = InvestmentWorker(TestingSessionLocal)
+    await worker.start()
+    await worker.join()
+    await worker.stop()
+    status = user_client.get(status_url).json()
+    assert status['allocated_at'] is not None, (
+        'При запуске воркер должен распределить ожидающие пожертвования.'
+    )
+    assert status['invested_amount'] == 100, (
+        'Фоновый воркер должен вложить пожертвование в открытый проект.'
+    )
+    assert charity_project.invested_amount == 100, (
+        'Фоновый воркер должен вложить пожертвование в открытый проект.'
+    )
+
+
+def test_sync_donation_is_allocated_immediately(user_client):
+    response = user_client.post(DONATION_URL, json={'full_amount': 100})
+    status = user_client.get(
+        DONATION_STATUS_URL.format(donation_id=response.json()['id'])
+    ).json()
+    assert status['allocated_at'] is not None, (
+        'В синхронном режиме пожертвование распределяется при создании.'
+    )
+
+
+async def test_failed_batch_is_retried(
+        monkeypatch, user_client, charity_project
+):
+    monkeypatch.setattr(settings, 'invest_mode', 'deferred')
+    monkeypatch.setattr(settings, 'invest_worker_retry_delay', 0)
+    response = user_client.post(DONATION_URL, json={'full_amount': 100})
+    worker = InvestmentWorker(TestingSessionLocal)
+    allocate = worker._allocate
+    calls = []
+
+    async def fail_once(donation_ids):
+        calls.append(donation_ids)
+        if len(calls) == 1:
+            raise RuntimeError('database is locked')
+        await allocate(donation_ids)
+
+    monkeypatch.setattr(worker, '_allocate', fail_once)
+    await worker.start()
+    await asyncio.wait_for(worker.join(), 5)
+    await worker.stop()
+    status = user_client.get(
+        DONATION_STATUS_URL.format(donation_id=response.json()['id'])
+    ).json()
+    assert len(calls) == 2, (
+        'Неудачный пакет должен возвращаться в очередь воркера.'
+    )
+    assert status['allocated_at'] is not None, (
+        'После повторной попытки пожертвование должно быть распределено.'
+    )
+
+
+async def test_retries_are_bounded(monkeypatch):
+    monkeypatch.setattr(settings, 'invest_worker_retry_delay', 0)
+    monkeypatch.setattr(settings, 'invest_worker_max_retries', 2)
+    worker = InvestmentWorker(TestingSessionLocal)
+    calls = []
+
+    async def always_fail(donation_ids):
+        calls.append(donation_ids)
+        raise RuntimeError('database is locked')
+
+    monkeypatch.setattr(worker, '_allocate', always_fail)
+    await worker.start()
+    worker.enqueue(1)
+    await asyncio.wait_for(worker.join(), 5)
+    await worker.stop()
+    assert len(calls) == 3, (
+        'Число повторных попыток распределения должно быть ограничено.'
+    )
+
+
+def test_unknown_invest_mode_fails_at_startup():
+    with pytest.raises(ValidationError):
+        Settings(invest_mode='defered')
@@ -1,7 +1,15 @@
 import pytest
+from conftest import app, current_user, engine
+from fixtures.user import superuser
+from pydantic import ValidationError
+from sqlalchemy import event
+
+from app.core.config import Settings, settings
 
 DONATION_URL = '/donation/'
 PROJECTS_URL = '/charity_project/'
+DONATION_STATEMENTS = 5
+OPEN_PROJECTS_PAGE = 'charityproject.remaining_amount >'
 
 
 @pytest.mark.usefixtures('donation')
@@ -60,3 +68,152 @@ def test_donation_to_little_invest_project(
     )
     assert not charity_project_nunchaku.fully_invested, common_asser_msg
     assert charity_project_nunchaku.invested_amount == 0, common_asser_msg
+
+
+@pytest.mark.parametrize('engine', ['python', 'sql'])
+def test_invest_engines_fill_projects_in_order(
+        engine, monkeypatch, user_client,
+        charity_project_little_invested, charity_project_nunchaku
+):
+    monkeypatch.setattr(settings, 'invest_engine', engine)
+    for full_amount in (999800, 300):
+        user_client.post(DONATION_URL, json={'full_amount': full_amount})
+    projects = user_client.get(PROJECTS_URL).json()
+    assert [
+        (project['invested_amount'], project['fully_invested'])
+        for project in projects
+    ] == [(1000000, True), (200, False)], (
+        f'Движок инвестирования `{engine}` должен закрывать проекты '
+        'в порядке их создания и переносить остаток в следующий проект.'
+    )
+
+
+@pytest.mark.parametrize('engine', ['python', 'sql'])
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_invest_engines_take_donations_in_order(
+        engine, monkeypatch, superuser_client
+):
+    monkeypatch.setattr(settings, 'invest_engine', engine)
+    response = superuser_client.post(PROJECTS_URL, json={
+        'name': 'Cats', 'description': 'Food for cats', 'full_amount': 1500,
+    })
+    assert response.json()['fully_invested'], (
+        f'Движок инвестирования `{engine}` должен закрыть проект, если '
+        'свободных пожертвований достаточно.'
+    )
+    donations = superuser_client.get(DONATION_URL).json()
+    assert [
+        (donation['invested_amount'], donation['fully_invested'])
+        for donation in donations
+    ] == [(100, True), (1400, False)], (
+        f'Движок инвестирования `{engine}` должен забирать средства '
+        'из пожертвований в порядке их поступления.'
+    )
+
+
+@pytest.mark.parametrize('open_pool_cache', [False, True])
+@pytest.mark.parametrize('engine', ['python', 'sql'])
+def test_invest_skips_project_with_no_remaining_amount(
+        engine, open_pool_cache, monkeypatch, superuser_client
+):
+    monkeypatch.setattr(settings, 'invest_engine', engine)
+    monkeypatch.setattr(settings, 'open_pool_cache', open_pool_cache)
+    monkeypatch.setitem(
+        app.dependency_overrides, current_user, lambda: superuser
+    )
+    for name, full_amount in (('Cats', 1000), ('Dogs', 100)):
+        superuser_client.post(PROJECTS_URL, json={
+            'name': name, 'description': 'Food', 'full_amount': full_amount,
+        })
+    superuser_client.post(DONATION_URL, json={'full_amount': 500})
+    superuser_client.patch(f'{PROJECTS_URL}1', json={'full_amount': 500})
+    superuser_client.post(DONATION_URL, json={'full_amount': 200})
+    donation = superuser_client.get(DONATION_URL).json()[-1]
+    assert donation['invested_amount'] == 100, (
+        'Открытый проект без остатка (требуемая сумма равна внесенной) '
+        'должен пропускаться при распределении пожертвования.'
+    )
+    projects = superuser_client.get(PROJECTS_URL).json()
+    assert [
+        (project['invested_amount'], project['fully_invested'])
+        for project in projects
+    ] == [(500, False), (100, True)], (
+        f'Движок инвестирования `{engine}` должен переносить средства '
+        'в следующий проект, минуя проект без остатка.'
+    )
+
+
+def test_invest_reads_open_projects_in_chunks(
+        monkeypatch, mixer, user_client,
+        charity_project_little_invested, charity_project_nunchaku
+):
+    mixer.blend(
+        'app.models.charity_project.CharityProject',
+        name='Last page',
+        description='Never read',
+        full_amount=1000,
+    )
+    monkeypatch.setattr(settings, 'invest_engine', 'python')
+    monkeypatch.setattr(settings, 'open_pool_cache', False)
+    monkeypatch.setattr(settings, 'invest_chunk_size', 1)
+    pages = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if OPEN_PROJECTS_PAGE in statement:
+            pages.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+    try:
+        user_client.post(DONATION_URL, json={'full_amount': 1000000})
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+    projects = user_client.get(PROJECTS_URL).json()
+    assert [
+        project['invested_amount'] for project in projects
+    ] == [1000000, 100, 0], (
+        'При постраничном чтении открытых проектов остаток пожертвования '
+        'должен переходить в проект со следующей страницы.'
+    )
+    assert len(pages) == 2, (
+        'Следующая страница открытых проектов должна запрашиваться, '
+        'только пока пожертвование не распределено целиком. '
+        f'Запрошено страниц: {len(pages)}'
+    )
+
+
+@pytest.mark.usefixtures('charity_project_little_invested')
+def test_donation_statement_count(
+        monkeypatch, user_client, charity_project_nunchaku
+):
+    monkeypatch.setattr(settings, 'invest_engine', 'python')
+    monkeypatch.setattr(settings, 'open_pool_cache', False)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+    try:
+        response = user_client.post(
+            DONATION_URL, json={'full_amount': 1000000}
+        )
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+    assert response.json()['id'], (
+        'Ответ на создание пожертвования должен содержать id.'
+    )
+    assert len(statements) == DONATION_STATEMENTS, (
+        'Создание пожертвования с распределением должно выполнять '
+        f'{DONATION_STATEMENTS} запросов: чтение открытых проектов, '
+        'пакетный UPDATE закрытых проектов, UPDATE частично '
+        'инвестированного проекта, INSERT пожертвования и пакетный '
+        f'INSERT журнала. Выполнено: {statements}'
+    )
+    assert charity_project_nunchaku.invested_amount == 100, (
+        'Остаток пожертвования должен перейти в следующий проект.'
+    )
+
+
+def test_unknown_invest_engine_fails_at_startup():
+    with pytest.raises(ValidationError):
+        Settings(invest_engine='SQL')
@@ -0,0 +1,102 @@
+import pytest
+
+DONATION_URL = '/donation/'
+MY_DONATIONS_URL = '/donation/my'
+BULK_URL = '/donation/bulk'
+PROJECTS_URL = '/charity_project/'
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+TOTAL_AMOUNT_HEADER = 'X-Total-Amount'
+UNPAGED_COUNT = 150
+
+
+def read_all_pages(client, url, limit):
+    pages = []
+    params = {'limit': limit}
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200, (
+            f'GET-запрос к `{url}` с параметрами пагинации должен '
+            'вернуть статус 200.'
+        )
+        pages.append([item['id'] for item in response.json()])
+        next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if next_cursor is None:
+            return pages
+        params = {'limit': limit, 'after': next_cursor}
+
+
+@pytest.mark.usefixtures(
+    'charity_project', 'charity_project_nunchaku', 'small_fully_charity_project'
+)
+def test_charity_projects_pagination(user_client):
+    pages = read_all_pages(user_client, PROJECTS_URL, limit=2)
+    assert pages == [[1, 2], [3]], (
+        f'Список `{PROJECTS_URL}` должен отдаваться страницами по `limit` '
+        f'записей в порядке id, курсор — в заголовке `{NEXT_CURSOR_HEADER}`.'
+    )
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_all_donations_pagination(superuser_client):
+    pages = read_all_pages(superuser_client, DONATION_URL, limit=1)
+    assert pages == [[1], [2]], (
+        f'Список `{DONATION_URL}` должен отдаваться страницами по `limit` '
+        f'записей в порядке id, курсор — в заголовке `{NEXT_CURSOR_HEADER}`.'
+    )
+
+
+def test_user_donations_pagination(user_client):
+    ids = [
+        user_client.post(DONATION_URL, json={'full_amount': 100}).json()['id']
+        for _ in range(3)
+    ]
+    pages = read_all_pages(user_client, MY_DONATIONS_URL, limit=2)
+    assert pages == [ids[:2], ids[2:]], (
+        f'Список `{MY_DONATIONS_URL}` должен отдаваться страницами '
+        'по `limit` записей в порядке id.'
+    )
+
+
+def test_lists_without_limit_are_not_truncated(user_client):
+    response = user_client.post(
+        BULK_URL,
+        data='\n'.join(['{"full_amount": 100}'] * UNPAGED_COUNT),
+        headers={'Content-Type': 'application/x-ndjson'},
+    )
+    ids = [result['id'] for result in response.json()]
+    response = user_client.get(MY_DONATIONS_URL)
+    assert [donation['id'] for donation in response.json()] == ids, (
+        f'Без `limit` список `{MY_DONATIONS_URL}` должен отдаваться '
+        'целиком, как до появления пагинации.'
+    )
+    assert NEXT_CURSOR_HEADER not in response.headers, (
+        'Без `limit` курсор следующей страницы не передается.'
+    )
+
+
+@pytest.mark.parametrize('params', [{'limit': 0}, {'after': -1}])
+def test_pagination_params_validation(params, user_client):
+    response = user_client.get(PROJECTS_URL, params=params)
+    assert response.status_code == 422, (
+        'Некорректные параметры пагинации должны отклоняться '
+        'со статусом 422.'
+    )
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_user_donations_total_amount(user_client):
+    user_client.post(DONATION_URL, json={'full_amount': 250})
+    response = user_client.get(
+        MY_DONATIONS_URL, params={'limit': 1, 'with_total': True}
+    )
+    assert len(response.json()) == 1, (
+        'Параметр `with_total` не должен влиять на размер страницы.'
+    )
+    assert response.headers.get(TOTAL_AMOUNT_HEADER) == '350', (
+        f'При `with_total=true` ответ `{MY_DONATIONS_URL}` должен содержать '
+        f'сумму всех пожертвований пользователя в `{TOTAL_AMOUNT_HEADER}`.'
+    )
+    response = user_client.get(MY_DONATIONS_URL)
+    assert TOTAL_AMOUNT_HEADER not in response.headers, (
+        f'Без `with_total` заголовок `{TOTAL_AMOUNT_HEADER}` не передается.'
+    )
@@ -0,0 +1,58 @@
+import threading
+
+from fastapi_users.password import PasswordHelper
+
+from app.core.config import settings
+
+REGISTER_URL = '/auth/register'
+LOGIN_URL = '/auth/jwt/login'
+STATS_URL = '/auth/password-hash/stats'
+CREDENTIALS = {'email': 'dead@pool.com', 'password': 'chimichangas4life'}
+
+
+def test_password_hashing_off_event_loop(monkeypatch, superuser_client):
+    threads = []
+    hash_password = PasswordHelper.hash
+    verify_password = PasswordHelper.verify_and_update
+
+    def record_hash(self, password):
+        threads.append(threading.current_thread().name)
+        return hash_password(self, password)
+
+    def record_verify(self, password, hashed_password):
+        threads.append(threading.current_thread().name)
+        return verify_password(self, password, hashed_password)
+
+    monkeypatch.setattr(PasswordHelper, 'hash', record_hash)
+    monkeypatch.setattr(PasswordHelper, 'verify_and_update', record_verify)
+    superuser_client.post(REGISTER_URL, json=CREDENTIALS)
+    response = superuser_client.post(LOGIN_URL, data={
+        'username': CREDENTIALS['email'],
+        'password': CREDENTIALS['password'],
+    })
+    assert response.status_code == 200, (
+        'Вход с верным паролем должен вернуть статус 200.'
+    )
+    superuser_client.post(LOGIN_URL, data={
+        'username': 'nobody@pool.com', 'password': 'chimichangas4life',
+    })
+    assert len(threads) == 3 and all(
+        name.startswith('password-hash') for name in threads
+    ), (
+        'Хеширование и проверка паролей должны выполняться в пуле '
+        f'потоков. Потоки: {threads}'
+    )
+
+
+def test_password_hash_queue_limit(monkeypatch, superuser_client):
+    monkeypatch.setattr(settings, 'password_hash_max_queue', 0)
+    response = superuser_client.post(REGISTER_URL, json=CREDENTIALS)
+    assert response.status_code == 503, (
+        'При переполненной очереди хеширования регистрация должна '
+        'отклоняться со статусом 503.'
+    )
+    stats = superuser_client.get(STATS_URL).json()
+    assert stats['rejected'] >= 1 and stats['queue_depth'] == 0, (
+        f'Эндпоинт `{STATS_URL}` должен возвращать глубину очереди '
+        'и число отклоненных задач.'
+    )
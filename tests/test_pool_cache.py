@@ -0,0 +1,87 @@
+import pytest
+from conftest import engine
+from sqlalchemy import event, text
+
+from app.core.config import settings
+from app.services.pool_cache import open_pool_cache
+
+DONATION_URL = '/donation/'
+PROJECTS_URL = '/charity_project/'
+POOL_SCAN = 'charityproject.remaining_amount >'
+ROW_LOAD = 'charityproject.id IN'
+
+
+@pytest.fixture
+def pool_cache(monkeypatch):
+    monkeypatch.setattr(settings, 'open_pool_cache', True)
+    monkeypatch.setattr(settings, 'invest_engine', 'python')
+    open_pool_cache.invalidate()
+    yield open_pool_cache
+    open_pool_cache.invalidate()
+
+
+@pytest.fixture
+def statements():
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+    yield captured
+    event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+
+
+@pytest.mark.usefixtures('pool_cache')
+def test_warm_pool_cache_skips_pool_query(
+        user_client, charity_project, charity_project_nunchaku, statements
+):
+    user_client.post(DONATION_URL, json={'full_amount': 999000})
+    assert any(POOL_SCAN in statement for statement in statements), (
+        'Холодный кэш пула должен загрузиться одним запросом.'
+    )
+    statements.clear()
+    user_client.post(DONATION_URL, json={'full_amount': 2000})
+    assert not any(POOL_SCAN in statement for statement in statements), (
+        'При актуальном кэше пула открытые проекты не должны '
+        'запрашиваться повторно.'
+    )
+    assert any(ROW_LOAD in statement for statement in statements), (
+        'При актуальном кэше пула должны загружаться только '
+        'изменяемые строки.'
+    )
+    projects = user_client.get(PROJECTS_URL).json()
+    assert [
+        project['invested_amount'] for project in projects
+    ] == [1000000, 1000], (
+        'Распределение через кэш пула должно совпадать с FIFO.'
+    )
+
+
+@pytest.mark.usefixtures('pool_cache')
+async def test_pool_cache_reloads_after_foreign_commit(
+        user_client, charity_project, charity_project_nunchaku, statements
+):
+    user_client.post(DONATION_URL, json={'full_amount': 1000})
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            'UPDATE charityproject SET invested_amount = full_amount, '
+            'remaining_amount = 0, fully_invested = 1 WHERE id = 1'
+        ))
+        await conn.execute(text(
+            'UPDATE tableversion SET version = version + 1 '
+            "WHERE name = 'charityproject'"
+        ))
+    statements.clear()
+    user_client.post(DONATION_URL, json={'full_amount': 1000})
+    assert any(POOL_SCAN in statement for statement in statements), (
+        'Если версия таблицы в БД изменилась, кэш пула должен '
+        'загрузиться заново.'
+    )
+    projects = user_client.get(PROJECTS_URL).json()
+    assert [
+        project['invested_amount'] for project in projects
+    ] == [1000000, 1000], (
+        'После изменения из другого процесса пожертвование должно '
+        'попасть в следующий открытый проект.'
+    )
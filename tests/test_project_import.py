@@ -0,0 +1,83 @@
+import pytest
+
+from app.core.config import settings
+
+BULK_URL = '/charity_project/bulk'
+PROJECTS_URL = '/charity_project/'
+DONATION_URL = '/donation/'
+
+
+def make_projects(*amounts):
+    return [
+        {
+            'name': f'Campaign {index}',
+            'description': 'Seasonal campaign',
+            'full_amount': amount,
+        }
+        for index, amount in enumerate(amounts)
+    ]
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_import_charity_projects(superuser_client):
+    response = superuser_client.post(
+        BULK_URL, json=make_projects(1000, 2000, 500)
+    )
+    assert response.status_code == 200, (
+        f'POST-запрос суперпользователя к эндпоинту `{BULK_URL}` '
+        'должен вернуть статус 200.'
+    )
+    projects = response.json()
+    assert [project['name'] for project in projects] == [
+        'Campaign 0', 'Campaign 1', 'Campaign 2'
+    ], (
+        'Пакетное создание должно вернуть проекты в порядке запроса.'
+    )
+    assert [
+        (project['invested_amount'], project['fully_invested'])
+        for project in projects
+    ] == [(1000, True), (1100, False), (0, False)], (
+        'Свободные пожертвования должны распределяться по новым проектам '
+        'в порядке пакета.'
+    )
+    donations = superuser_client.get(DONATION_URL).json()
+    assert all(donation['fully_invested'] for donation in donations), (
+        'Пожертвования, распределенные по новым проектам, '
+        'должны быть закрыты.'
+    )
+
+
+@pytest.mark.parametrize('projects', [
+    make_projects(1000, 2000) + make_projects(3000)[:1],
+    make_projects(100) + [{
+        'name': 'chimichangas4life',
+        'description': 'Huge fan of chimichangas',
+        'full_amount': 100,
+    }],
+])
+@pytest.mark.usefixtures('charity_project')
+def test_import_charity_projects_unique_names(projects, superuser_client):
+    response = superuser_client.post(BULK_URL, json=projects)
+    assert response.status_code == 400, (
+        'Пакет с повторяющимися или занятыми именами проектов '
+        'должен отклоняться со статусом 400.'
+    )
+    assert len(superuser_client.get(PROJECTS_URL).json()) == 1, (
+        'Отклоненный пакет не должен создавать проекты.'
+    )
+
+
+def test_import_charity_projects_size_limit(monkeypatch, superuser_client):
+    monkeypatch.setattr(settings, 'project_import_max_size', 1)
+    response = superuser_client.post(BULK_URL, json=make_projects(100, 200))
+    assert response.status_code == 413, (
+        'Пакет сверх допустимого размера должен отклоняться '
+        'со статусом 413.'
+    )
+
+
+def test_import_charity_projects_only_superuser(user_client):
+    response = user_client.post(BULK_URL, json=make_projects(100))
+    assert response.status_code == 403, (
+        'Пакетное создание проектов доступно только суперпользователю.'
+    )
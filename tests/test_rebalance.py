@@ -0,0 +1,69 @@
+from conftest import TestingSessionLocal
+from sqlalchemy import delete, update
+
+from app.models import Allocation, CharityProject, Donation
+from app.services.rebalance import rebalance
+
+DONATION_URL = '/donation/'
+PROJECTS_URL = '/charity_project/'
+DONATION_ALLOCATIONS_URL = DONATION_URL + '{donation_id}/allocations'
+
+
+def get_fund_state(client, donation_ids):
+    projects = client.get(PROJECTS_URL).json()
+    for project in projects:
+        assert (project.pop('close_date', None) is not None) == (
+            project['fully_invested']
+        ), 'Дата закрытия должна быть только у закрытых проектов.'
+    return (
+        projects,
+        [
+            client.get(
+                DONATION_ALLOCATIONS_URL.format(donation_id=donation_id)
+            ).json()
+            for donation_id in donation_ids
+        ],
+    )
+
+
+async def test_rebalance_restores_fifo_state(
+        user_client, charity_project, charity_project_nunchaku
+):
+    donation_ids = [
+        user_client.post(
+            DONATION_URL, json={'full_amount': full_amount}
+        ).json()['id']
+        for full_amount in (600000, 600000, 300)
+    ]
+    projects, allocations = get_fund_state(user_client, donation_ids)
+    async with TestingSessionLocal() as session:
+        for model in (Donation, CharityProject):
+            await session.execute(
+                update(model).values(
+                    invested_amount=0,
+                    remaining_amount=model.full_amount,
+                    fully_invested=False,
+                    close_date=None,
+                )
+            )
+        await session.execute(delete(Allocation))
+        await session.commit()
+        report = await rebalance(session)
+        assert 'Пожертвования: изменится 3 из 3' in report, (
+            'Отчет пересчета должен показывать, сколько строк изменится.'
+        )
+        await rebalance(session, apply=True)
+    rebalanced_projects, rebalanced_allocations = get_fund_state(
+        user_client, donation_ids
+    )
+    assert rebalanced_projects == projects, (
+        'Пересчет фонда должен восстановить суммы проектов так же, '
+        'как при последовательном инвестировании.'
+    )
+    assert [
+        [(item['charity_project_id'], item['amount']) for item in items]
+        for items in rebalanced_allocations
+    ] == [
+        [(item['charity_project_id'], item['amount']) for item in items]
+        for items in allocations
+    ], 'Пересчет фонда должен восстановить журнал переводов.'
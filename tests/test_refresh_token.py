@@ -0,0 +1,119 @@
+import pytest
+from conftest import override_db
+from fastapi.testclient import TestClient
+
+from app.core.db import get_async_session
+from app.core.user import password_hash_pool, user_cache
+from app.main import app
+
+LOGIN_URL = '/auth/jwt/login'
+REFRESH_URL = '/auth/jwt/refresh'
+REVOKE_URL = '/auth/jwt/revoke'
+MY_DONATIONS_URL = '/donation/my'
+USERS_ME_URL = '/users/me'
+PASSWORD = 'chimichangas4life'
+
+
+@pytest.fixture
+def auth_client():
+    app.dependency_overrides = {}
+    app.dependency_overrides[get_async_session] = override_db
+    user_cache.reset()
+    with TestClient(app) as client:
+        yield client
+    user_cache.reset()
+
+
+def login(client, email='dead@pool.com'):
+    client.post('/auth/register', json={'email': email, 'password': PASSWORD})
+    return client.post(LOGIN_URL, data={
+        'username': email, 'password': PASSWORD,
+    }).json()
+
+
+def refresh(client, refresh_token):
+    return client.post(REFRESH_URL, json={'refresh_token': refresh_token})
+
+
+def auth_headers(tokens):
+    return {'Authorization': f'Bearer {tokens["access_token"]}'}
+
+
+def test_login_returns_refresh_token(auth_client):
+    tokens = login(auth_client)
+    assert {'access_token', 'refresh_token', 'token_type'} <= set(tokens), (
+        f'Ответ `{LOGIN_URL}` должен содержать access- и refresh-токены.'
+    )
+
+
+def test_refresh_without_password_hashing(monkeypatch, auth_client):
+    tokens = login(auth_client)
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError('bcrypt')
+
+    monkeypatch.setattr(password_hash_pool, 'run', forbidden)
+    response = refresh(auth_client, tokens['refresh_token'])
+    assert response.status_code == 200, (
+        f'POST-запрос к `{REFRESH_URL}` с действующим refresh-токеном '
+        'должен вернуть статус 200 без проверки пароля.'
+    )
+    new_tokens = response.json()
+    assert new_tokens['refresh_token'] != tokens['refresh_token'], (
+        'Обмен должен выдавать новый refresh-токен.'
+    )
+    response = auth_client.get(MY_DONATIONS_URL, headers=auth_headers(
+        new_tokens
+    ))
+    assert response.status_code == 200, (
+        'Access-токен, полученный обменом, должен давать доступ к API.'
+    )
+
+
+def test_refresh_token_reuse_revokes_family(auth_client):
+    tokens = login(auth_client)
+    new_tokens = refresh(auth_client, tokens['refresh_token']).json()
+    response = refresh(auth_client, tokens['refresh_token'])
+    assert response.status_code == 401, (
+        'Повторное предъявление использованного refresh-токена '
+        'должно вернуть статус 401.'
+    )
+    response = refresh(auth_client, new_tokens['refresh_token'])
+    assert response.status_code == 401, (
+        'Повторное предъявление refresh-токена должно отзывать все '
+        'refresh-токены пользователя.'
+    )
+
+
+@pytest.mark.parametrize('refresh_token', ['not a token', None])
+def test_refresh_rejects_invalid_tokens(refresh_token, auth_client):
+    tokens = login(auth_client)
+    response = refresh(auth_client, refresh_token or tokens['access_token'])
+    assert response.status_code == 401, (
+        'Поддельный токен или access-токен не должен обмениваться '
+        'на новую пару токенов.'
+    )
+
+
+def test_revoked_refresh_token_rejected(auth_client):
+    tokens = login(auth_client)
+    response = auth_client.post(
+        REVOKE_URL, json={'refresh_token': tokens['refresh_token']}
+    )
+    assert response.status_code == 204, (
+        f'POST-запрос к `{REVOKE_URL}` должен вернуть статус 204.'
+    )
+    assert refresh(auth_client, tokens['refresh_token']).status_code == 401, (
+        'Отозванный refresh-токен не должен обмениваться.'
+    )
+
+
+def test_password_change_revokes_refresh_tokens(auth_client):
+    tokens = login(auth_client)
+    auth_client.patch(
+        USERS_ME_URL, json={'password': 'newchimichangas'},
+        headers=auth_headers(tokens),
+    )
+    assert refresh(auth_client, tokens['refresh_token']).status_code == 401, (
+        'Смена пароля должна отзывать refresh-токены пользователя.'
+    )
@@ -0,0 +1,137 @@
+import pytest
+from conftest import engine
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.response_cache import response_cache
+from app.services.table_version import bump_changed_tables
+
+DONATION_URL = '/donation/'
+PROJECTS_URL = '/charity_project/'
+PROJECT_URL = '/charity_project/{project_id}'
+STATS_URL = '/charity_project/cache/stats'
+
+
+@pytest.fixture(autouse=True)
+def enable_response_cache(monkeypatch):
+    monkeypatch.setattr(settings, 'response_cache_max_bytes', 1_000_000)
+    response_cache.reset()
+    yield
+    monkeypatch.undo()
+    response_cache.reset()
+
+
+def get_counting_statements(client, url):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+    return response, statements
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+@pytest.mark.parametrize(
+    'url', [PROJECTS_URL, PROJECT_URL.format(project_id=1)]
+)
+def test_cache_hit_without_database(url, user_client):
+    miss = user_client.get(url)
+    assert miss.headers.get('X-Cache') == 'MISS', (
+        'Первый запрос должен собираться из БД.'
+    )
+    hit, statements = get_counting_statements(user_client, url)
+    assert hit.headers.get('X-Cache') == 'HIT', (
+        'Повторный запрос должен отдаваться из кэша ответов.'
+    )
+    assert statements == [], (
+        f'Ответ из кэша не должен обращаться к БД. Выполнено: {statements}'
+    )
+    assert hit.json() == miss.json() and (
+        hit.headers.get('ETag') == miss.headers.get('ETag')
+    ), (
+        'Ответ из кэша должен совпадать с исходным.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project')
+def test_cache_invalidated_by_investment(user_client):
+    user_client.get(PROJECTS_URL)
+    user_client.post(DONATION_URL, json={'full_amount': 100})
+    response = user_client.get(PROJECTS_URL)
+    assert response.headers.get('X-Cache') == 'MISS', (
+        'Распределение пожертвования должно сбрасывать кэш списка проектов.'
+    )
+    assert response.json()[0]['invested_amount'] == 100, (
+        'После распределения пожертвования список проектов '
+        'должен содержать новые суммы.'
+    )
+
+
+@pytest.fixture
+def table_versions_last():
+    """Выполнять слушатель версий таблиц после слушателя кэша ответов."""
+    event.remove(Session, 'before_commit', bump_changed_tables)
+    event.listen(Session, 'before_commit', bump_changed_tables)
+    yield
+    event.remove(Session, 'before_commit', bump_changed_tables)
+    event.listen(Session, 'before_commit', bump_changed_tables, insert=True)
+
+
+@pytest.mark.usefixtures('charity_project', 'table_versions_last')
+def test_cache_invalidation_does_not_depend_on_listener_order(
+        superuser_client
+):
+    url = PROJECT_URL.format(project_id=1)
+    superuser_client.get(url)
+    superuser_client.patch(url, json={'description': 'New description'})
+    response = superuser_client.get(url)
+    assert response.headers.get('X-Cache') == 'MISS', (
+        'Кэш ответов должен сбрасываться, даже если его слушатель '
+        'коммита выполняется раньше слушателя версий таблиц.'
+    )
+    assert response.json()['description'] == 'New description', (
+        'После изменения проекта ответ должен содержать новые данные.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_cache_invalidated_precisely(superuser_client):
+    urls = [PROJECT_URL.format(project_id=obj_id) for obj_id in (1, 2)]
+    for url in (*urls, PROJECTS_URL):
+        superuser_client.get(url)
+    superuser_client.patch(urls[1], json={'description': 'New description'})
+    cache_states = [
+        superuser_client.get(url).headers.get('X-Cache')
+        for url in (*urls, PROJECTS_URL)
+    ]
+    assert cache_states == ['HIT', 'MISS', 'MISS'], (
+        'Изменение проекта должно сбрасывать только его запись '
+        'и списки проектов.'
+    )
+    stats = superuser_client.get(STATS_URL).json()
+    assert (stats['hits'], stats['misses']) == (1, 5), (
+        f'Эндпоинт `{STATS_URL}` должен возвращать счетчики попаданий '
+        'и промахов кэша.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_cache_size_limit(monkeypatch, superuser_client):
+    first = superuser_client.get(PROJECT_URL.format(project_id=1))
+    monkeypatch.setattr(
+        settings, 'response_cache_max_bytes', len(first.content) + 10
+    )
+    response_cache.reset()
+    superuser_client.get(PROJECT_URL.format(project_id=1))
+    superuser_client.get(PROJECT_URL.format(project_id=2))
+    stats = superuser_client.get(STATS_URL).json()
+    assert stats['evictions'] == 1 and stats['entries'] == 1, (
+        'Кэш ответов должен вытеснять записи сверх допустимого размера '
+        'и считать вытеснения.'
+    )
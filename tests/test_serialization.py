@@ -0,0 +1,41 @@
+import pytest
+
+from app.core.config import settings
+
+DONATION_URL = '/donation/'
+PROJECTS_URL = '/charity_project/'
+PROJECT_URL = '/charity_project/1'
+
+
+@pytest.mark.usefixtures(
+    'charity_project', 'charity_project_nunchaku', 'small_fully_charity_project'
+)
+@pytest.mark.parametrize('url', [PROJECTS_URL, PROJECT_URL])
+def test_fast_serialization_projects(url, monkeypatch, user_client):
+    expected = user_client.get(url).json()
+    monkeypatch.setattr(settings, 'fast_serialization', True)
+    response = user_client.get(url)
+    assert response.status_code == 200, (
+        f'GET-запрос к `{url}` с быстрой сериализацией '
+        'должен вернуть статус 200.'
+    )
+    assert response.json() == expected, (
+        'Быстрая сериализация должна давать тот же ответ, '
+        'что и вывод через pydantic-схему.'
+    )
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_fast_serialization_donations(monkeypatch, superuser_client):
+    expected = superuser_client.get(DONATION_URL, params={'limit': 1})
+    monkeypatch.setattr(settings, 'fast_serialization', True)
+    response = superuser_client.get(DONATION_URL, params={'limit': 1})
+    assert response.json() == expected.json(), (
+        'Быстрая сериализация должна давать тот же ответ, '
+        'что и вывод через pydantic-схему.'
+    )
+    assert response.headers['X-Next-Cursor'] == (
+        expected.headers['X-Next-Cursor']
+    ), (
+        'Быстрая сериализация не должна отключать пагинацию.'
+    )
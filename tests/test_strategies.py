@@ -0,0 +1,123 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import event
+
+from app.core.config import Settings, settings
+from app.models import CharityProject
+from app.services.strategies import STRATEGIES, STRATEGY_PROPORTIONAL
+
+DONATION_URL = '/donation/'
+BULK_URL = '/donation/bulk'
+PROJECTS_URL = '/charity_project/'
+
+
+@pytest.mark.parametrize('strategy, expected', [
+    ('fifo', [200, 0]),
+    ('largest_remaining', [0, 200]),
+    ('proportional', [33, 167]),
+])
+def test_strategy_picks_projects(
+        strategy, expected, monkeypatch, user_client,
+        charity_project, charity_project_nunchaku
+):
+    monkeypatch.setattr(settings, 'allocation_strategy', strategy)
+    user_client.post(DONATION_URL, json={'full_amount': 200})
+    projects = user_client.get(PROJECTS_URL).json()
+    assert [
+        project['invested_amount'] for project in projects
+    ] == expected, (
+        f'Стратегия `{strategy}` распределила пожертвование '
+        'между проектами в неверном порядке или пропорции.'
+    )
+
+
+def test_closest_to_goal_strategy(
+        monkeypatch, user_client,
+        charity_project_nunchaku, charity_project_little_invested
+):
+    monkeypatch.setattr(settings, 'allocation_strategy', 'closest_to_goal')
+    for full_amount in (999900, 300):
+        user_client.post(DONATION_URL, json={'full_amount': full_amount})
+    projects = user_client.get(PROJECTS_URL).json()
+    assert [
+        (project['invested_amount'], project['fully_invested'])
+        for project in projects
+    ] == [(300, False), (1000000, True)], (
+        'Стратегия `closest_to_goal` должна сначала закрывать проект, '
+        'которому осталось меньше всего до цели.'
+    )
+
+
+@pytest.mark.parametrize('strategy', ['closest_to_goal', 'proportional'])
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_strategy_fills_project_from_donations(
+        strategy, monkeypatch, superuser_client
+):
+    monkeypatch.setattr(settings, 'allocation_strategy', strategy)
+    response = superuser_client.post(PROJECTS_URL, json={
+        'name': 'Cats', 'description': 'Food for cats', 'full_amount': 2100,
+    })
+    assert response.json()['fully_invested'], (
+        f'Стратегия `{strategy}` должна закрыть проект, если свободных '
+        'пожертвований достаточно.'
+    )
+    donations = superuser_client.get(DONATION_URL).json()
+    assert all(donation['fully_invested'] for donation in donations), (
+        f'Стратегия `{strategy}` должна забрать все пожертвования, '
+        'если их сумма равна цели проекта.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project_nunchaku')
+def test_strategy_reads_only_needed_page(
+        monkeypatch, user_client, charity_project_little_invested
+):
+    monkeypatch.setattr(settings, 'allocation_strategy', 'closest_to_goal')
+    monkeypatch.setattr(settings, 'invest_chunk_size', 1)
+    loaded = []
+
+    def count_load(target, context):
+        loaded.append(target.id)
+
+    event.listen(CharityProject, 'load', count_load)
+    try:
+        user_client.post(DONATION_URL, json={'full_amount': 200})
+    finally:
+        event.remove(CharityProject, 'load', count_load)
+    assert loaded == [charity_project_little_invested.id], (
+        'Стратегия должна читать открытый пул постранично в своем порядке, '
+        'а не загружать его целиком.'
+    )
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_largest_remaining_reorders_pool_between_targets(
+        monkeypatch, user_client
+):
+    monkeypatch.setattr(settings, 'allocation_strategy', 'largest_remaining')
+    user_client.post(
+        BULK_URL,
+        data='{"full_amount": 4500000}\n{"full_amount": 1000}\n',
+        headers={'Content-Type': 'application/x-ndjson'},
+    )
+    projects = user_client.get(PROJECTS_URL).json()
+    assert [
+        project['invested_amount'] for project in projects
+    ] == [1000, 4500000], (
+        'Стратегия `largest_remaining` должна учитывать остатки, '
+        'измененные предыдущими пожертвованиями пакета.'
+    )
+
+
+def test_unknown_strategy_fails_at_startup():
+    with pytest.raises(ValidationError):
+        Settings(allocation_strategy='fifo ')
+
+
+@pytest.mark.parametrize(
+    'strategy', [*STRATEGIES, STRATEGY_PROPORTIONAL]
+)
+def test_registered_strategies_are_accepted(strategy):
+    assert Settings(allocation_strategy=strategy).allocation_strategy == (
+        strategy
+    ), 'Настройки должны принимать все зарегистрированные стратегии.'
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from app.core.config import settings
+
+DONATION_URL = '/donation/'
+MY_DONATIONS_URL = '/donation/my'
+PROJECTS_URL = '/charity_project/'
+
+
+def read_ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.mark.usefixtures(
+    'charity_project', 'charity_project_nunchaku', 'small_fully_charity_project'
+)
+@pytest.mark.parametrize('stream, read', [
+    ('ndjson', read_ndjson),
+    ('json', lambda response: response.json()),
+])
+def test_charity_projects_stream(stream, read, monkeypatch, user_client):
+    monkeypatch.setattr(settings, 'stream_chunk_size', 2)
+    expected = user_client.get(PROJECTS_URL).json()
+    response = user_client.get(
+        PROJECTS_URL, params={'stream': stream, 'limit': 1}
+    )
+    assert response.status_code == 200, (
+        f'GET-запрос к `{PROJECTS_URL}` с параметром `stream` '
+        'должен вернуть статус 200.'
+    )
+    assert read(response) == expected, (
+        'Потоковая выдача должна содержать весь список в порядке id '
+        'без учета `limit` и совпадать с обычным ответом.'
+    )
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_all_donations_stream_after(superuser_client):
+    response = superuser_client.get(
+        DONATION_URL, params={'stream': 'ndjson', 'after': 1}
+    )
+    assert response.headers['content-type'] == 'application/x-ndjson', (
+        'Выдача в формате NDJSON должна иметь тип `application/x-ndjson`.'
+    )
+    assert [item['id'] for item in read_ndjson(response)] == [2], (
+        'Потоковая выдача должна начинаться после курсора `after`.'
+    )
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_user_donations_stream(user_client):
+    expected = user_client.get(MY_DONATIONS_URL).json()
+    response = user_client.get(MY_DONATIONS_URL, params={'stream': 'json'})
+    assert response.json() == expected == [
+        {
+            'id': 1,
+            'full_amount': 100,
+            'comment': 'To you for chimichangas',
+            'create_date': '2011-11-11T00:00:00',
+        },
+    ], (
+        'Потоковая выдача своих пожертвований должна содержать '
+        'только пожертвования пользователя.'
+    )
+
+
+def test_stream_format_validation(user_client):
+    response = user_client.get(PROJECTS_URL, params={'stream': 'csv'})
+    assert response.status_code == 422, (
+        'Неизвестный формат потоковой выдачи должен отклоняться '
+        'со статусом 422.'
+    )
@@ -0,0 +1,85 @@
+import pytest
+from conftest import TEST_DB, engine, override_db
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+
+from app.core.db import get_async_session
+from app.core.user import user_cache
+from app.main import app
+
+MY_DONATIONS_URL = '/donation/my'
+USERS_URL = '/users/{user_id}'
+
+
+@pytest.fixture
+def auth_client():
+    app.dependency_overrides = {}
+    app.dependency_overrides[get_async_session] = override_db
+    user_cache.reset()
+    with TestClient(app) as client:
+        yield client
+    user_cache.reset()
+
+
+def login(client, email):
+    user_id = client.post('/auth/register', json={
+        'email': email, 'password': 'chimichangas4life',
+    }).json()['id']
+    token = client.post('/auth/jwt/login', data={
+        'username': email, 'password': 'chimichangas4life',
+    }).json()['access_token']
+    return user_id, {'Authorization': f'Bearer {token}'}
+
+
+def get_counting_user_queries(client, url, headers):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(url, headers=headers)
+    finally:
+        event.remove(engine.sync_engine, 'before_cursor_execute', capture)
+    return response, [sql for sql in statements if 'FROM user' in sql]
+
+
+def test_user_loaded_once_per_token(auth_client):
+    _, headers = login(auth_client, 'dead@pool.com')
+    response, queries = get_counting_user_queries(
+        auth_client, MY_DONATIONS_URL, headers
+    )
+    assert response.status_code == 200 and len(queries) == 1, (
+        'Первый запрос с токеном должен загрузить пользователя из БД.'
+    )
+    response, queries = get_counting_user_queries(
+        auth_client, MY_DONATIONS_URL, headers
+    )
+    assert response.status_code == 200 and queries == [], (
+        'Повторные запросы с тем же токеном не должны читать '
+        f'пользователя из БД. Выполнено: {queries}'
+    )
+
+
+def test_user_cache_invalidated_on_update(auth_client):
+    user_id, headers = login(auth_client, 'dead@pool.com')
+    admin_id, admin_headers = login(auth_client, 'admin@pool.com')
+    with create_engine(f'sqlite:///{TEST_DB}').begin() as connection:
+        connection.execute(
+            text('UPDATE user SET is_superuser = 1 WHERE id = :id'),
+            {'id': admin_id},
+        )
+    assert auth_client.get(MY_DONATIONS_URL, headers=headers).status_code == (
+        200
+    ), 'Активный пользователь должен получать свои пожертвования.'
+    auth_client.patch(
+        USERS_URL.format(user_id=user_id),
+        json={'is_active': False},
+        headers=admin_headers,
+    )
+    response = auth_client.get(MY_DONATIONS_URL, headers=headers)
+    assert response.status_code == 401, (
+        'После деактивации пользователя через `/users/{id}` его токен '
+        'должен перестать приниматься, несмотря на кэш.'
+    )